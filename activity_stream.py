@@ -0,0 +1,273 @@
+import csv
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from class_ranking import ClassRanking
+from leaderboard import Leaderboard
+from progress_trends import TrendTracker
+from student_index import StudentIndex
+
+# Append-only activity event log: one JSON object per line, or a CSV file with a header row.
+# Each event has student_id, activity, subject, score, an ISO 8601 timestamp and optionally student_name.
+EVENTS_PATH = os.environ.get('ACTIVITY_EVENTS', 'activity_events.jsonl')
+
+EVENT_COLUMNS = ['student_id', 'student_name', 'activity', 'subject', 'score', 'timestamp']
+EVENT_BATCH_SIZE = 1000
+
+
+# Complete lines appended to a file since the last read, tracked by byte offset; a trailing
+# line without a newline is still being written and is left for the next read
+class FileTail:
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.offset = offset
+
+    def lines(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self.offset:  # truncated or replaced: start over
+            self.offset = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self.offset += len(line)
+                yield line
+
+
+def jsonl_events(lines):
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict):
+            yield event
+
+
+def csv_events(lines, header):
+    for row in csv.reader(line.decode('utf-8', errors='replace') for line in lines):
+        if len(row) == len(header):
+            yield dict(zip(header, row))
+
+
+# Event fields as a tuple in EVENT_COLUMNS order; events without a student or a numeric score are skipped.
+# student_name is None when the event does not carry one.
+def event_records(events):
+    for event in events:
+        student_id = event.get('student_id')
+        try:
+            score = float(event.get('score'))
+        except (TypeError, ValueError):
+            continue
+        if student_id in (None, '') or not np.isfinite(score):
+            continue
+        student_id = str(student_id)
+        student_name = event.get('student_name')
+        yield (student_id, str(student_name) if student_name else None, str(event.get('activity', '')), str(event.get('subject', '')), score, event.get('timestamp'))
+
+
+def batched(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# One batch of records as an activity frame; timestamps are parsed for the whole batch at once,
+# converted to naive UTC, and rows with unparseable timestamps are dropped
+def batch_frame(batch):
+    frame = pd.DataFrame.from_records(batch, columns=EVENT_COLUMNS)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], errors='coerce', format='ISO8601', utc=True).dt.tz_localize(None)
+    return frame[frame['timestamp'].notna()].reset_index(drop=True)
+
+
+# Generator pipeline from new lines in the event file to typed activity frames of up to `batch_size` rows
+class EventReader:
+    def __init__(self, path, batch_size=EVENT_BATCH_SIZE):
+        self.tail = FileTail(path)
+        self.is_csv = path.lower().endswith('.csv')
+        self.batch_size = batch_size
+        self.header = None
+
+    def batches(self):
+        lines = self.tail.lines()
+        if self.is_csv:
+            if self.header is None:
+                first = next(lines, None)
+                if first is None:
+                    return
+                self.header = next(csv.reader([first.decode('utf-8-sig')]))
+            events = csv_events(lines, self.header)
+        else:
+            events = jsonl_events(lines)
+        for batch in batched(event_records(events), self.batch_size):
+            frame = batch_frame(batch)
+            if not frame.empty:
+                yield frame
+
+
+# Append-optimized columnar store for activity rows: one numpy array per column with spare
+# capacity that doubles when full, so appends are amortized O(1) per row and `frame` is a
+# zero-copy view of the filled prefix instead of a concat of the whole history
+class ActivityBuffer:
+    def __init__(self, frame, capacity=1024):
+        self.columns = list(frame.columns)
+        self._size = len(frame)
+        capacity = max(capacity, 1 << max(self._size - 1, 0).bit_length())
+        self._arrays = {}
+        for column in self.columns:
+            values = frame[column].to_numpy()
+            array = np.empty(capacity, dtype=values.dtype)
+            array[:self._size] = values
+            self._arrays[column] = array
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size):
+        capacity = len(next(iter(self._arrays.values())))
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for column, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._arrays[column] = grown
+
+    def append(self, frame):
+        count = len(frame)
+        end = self._size + count
+        self._reserve(end)
+        for column in self.columns:
+            values = frame[column].to_numpy()
+            array = self._arrays[column]
+            dtype = np.result_type(array.dtype, values.dtype)
+            if dtype != array.dtype:  # e.g. integer scores meeting fractional ones
+                array = self._arrays[column] = array.astype(dtype)
+            array[self._size:end] = values
+        self._size = end
+
+    def frame(self):
+        return pd.DataFrame(
+            {column: pd.Series(array[:self._size], dtype=array.dtype, copy=False) for column, array in self._arrays.items()},
+            copy=False,
+        )
+
+
+# Key of an activity row for matching a recorded score with the same row read back from the store
+def _row_key(student_id, activity, subject, score, timestamp):
+    return student_id, activity, subject, float(score), pd.Timestamp(timestamp)
+
+
+# Activity history seeded from a frame and the activity rows saved in a classroom store, with the
+# student index, class ranking, leaderboards and trends derived from it. New rows are folded into all of them rather than rebuilt from the whole
+# history: scores recorded through `record`, and rows committed to the classroom store by others,
+# which `sync` reads incrementally once the store's activity version moves on.
+# Those structures are updated in place and are not thread-safe: a history shared between threads
+# is only read while holding `lock`, which every update holds while it applies its rows.
+class ActivityHistory:
+    def __init__(self, base, store=None):
+        self.store_version = None
+        self.store_row_id = 0
+        self._recorded = Counter()  # keys of recorded rows not yet read back from the store
+        if store is not None:
+            self.store_version = store.versions['activity_scores']
+            saved = store.load_activities()
+            if not saved.empty:
+                self.store_row_id = int(saved['id'].max())
+                base = pd.concat([base[EVENT_COLUMNS], saved[EVENT_COLUMNS]], ignore_index=True)
+
+        self.buffer = ActivityBuffer(base[EVENT_COLUMNS])
+        self.df = self.buffer.frame()
+        self.student_index = StudentIndex(self.df)
+        self.class_ranking = ClassRanking.from_frame(self.df)
+        self.trend_tracker = TrendTracker.from_frame(self.df)
+        self.leaderboard = Leaderboard.from_frame(self.df)
+        self.version = 0
+        self.lock = threading.RLock()
+
+    # Events without a name get the student's known name, or their ID for a new student
+    def _with_names(self, batch):
+        missing = batch['student_name'].isna()
+        if missing.any():
+            student_ids = batch.loc[missing, 'student_id']
+            batch.loc[missing, 'student_name'] = student_ids.map(self.student_index.names).fillna(student_ids)
+        return batch
+
+    # Fold batches of new rows into the history; the caller holds the lock.
+    # Returns the number of rows added.
+    def _append(self, batches):
+        start = len(self.buffer)
+        for batch in batches:
+            names = batch['student_name'].astype(object).where(batch['student_name'].notna(), None)
+            columns = [names if column == 'student_name' else batch[column] for column in EVENT_COLUMNS]
+            for student_id, student_name, activity, subject, score, timestamp in zip(*columns):
+                self.class_ranking.add_score(student_id, score, student_name)
+                self.trend_tracker.add(student_id, subject, score, timestamp)
+                self.leaderboard.add_score(student_id, subject, activity, score, student_name)
+            self.buffer.append(self._with_names(batch))
+        added = len(self.buffer) - start
+        if added:
+            self.df = self.buffer.frame()
+            self.student_index.extend(self.df, start)
+            self.version += 1
+        return added
+
+    # Save one score to the store and apply it right away, without waiting for the store's
+    # background writer; `sync` skips the row when it reads it back
+    def record(self, store, student_id, student_name, activity, subject, score, timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        batch = pd.DataFrame([(student_id, student_name, activity, subject, float(score), timestamp)], columns=EVENT_COLUMNS)
+        with self.lock:
+            self._recorded[_row_key(student_id, activity, subject, score, timestamp)] += 1
+            self._append([batch])
+            store.add_activity(student_id, student_name, activity, subject, score, timestamp)
+
+    # Apply the activity rows committed to `store` since the last sync; returns the number of rows added
+    def sync(self, store):
+        version = store.versions['activity_scores']
+        if version == self.store_version:
+            return 0
+        with self.lock:
+            rows = store.load_activities(after_id=self.store_row_id)
+            self.store_version = version
+            if rows.empty:
+                return 0
+            self.store_row_id = int(rows['id'].max())
+            keep = []
+            for key in zip(rows['student_id'], rows['activity'], rows['subject'], rows['score'], rows['timestamp']):
+                key = _row_key(*key)
+                recorded = self._recorded[key] > 0
+                if recorded:
+                    self._recorded[key] -= 1
+                keep.append(not recorded)
+            self._recorded += Counter()  # drop keys whose rows have all been read back
+            new_rows = rows.loc[keep, EVENT_COLUMNS].reset_index(drop=True)
+            return self._append([new_rows]) if not new_rows.empty else 0
+
+
+# Activity history that also follows the event file. Each poll reads only the lines appended
+# since the last one and applies them like any other new rows.
+class LiveActivityFeed(ActivityHistory):
+    def __init__(self, path, base, store=None, batch_size=EVENT_BATCH_SIZE):
+        super().__init__(base, store)
+        self.reader = EventReader(path, batch_size)
+
+    # Apply new events; returns the number of rows added
+    def poll(self):
+        with self.lock:
+            return self._append(self.reader.batches())
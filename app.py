@@ -1,7 +1,29 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from charts import draw_struggle_pie, render_chart, score_distribution_chart
+from paging import frame_page, page_count
+from profiler import page_profiler, profile_panel, span
+from recommendations import ADVANCED_RECOMMENDATION, recommend_batch, recommendations_markdown
+from storage import get_store
+from student_dataset import DATASET_PATH, load_student_dataset, roster_frame
+
+# Roster rows sent to the browser at a time
+ROWS_PER_PAGE = 100
+
+store = get_store()
+
+# Students added through the sidebar, reloaded only after the store commits new student rows
+@st.cache_data(max_entries=4)
+def load_saved_students(version):
+    return store.load_students()
+
+# Roster built from student-dataset.csv, reparsed only when the file changes
+@st.cache_data(max_entries=1)
+def load_dataset_roster(mtime_ns):
+    return roster_frame(load_student_dataset())
 
 # Example: Data frame for tracking student performance
 data = pd.DataFrame({
@@ -10,20 +32,28 @@ data = pd.DataFrame({
     'Struggles_with': ['Math', 'Science', 'Math']
 })
 
-# Personalized learning path decision tree
-def recommend_resources(score, struggle_area):
-    if score < 50:
-        return f"Provide basic resources in {struggle_area}."
-    elif score < 70:
-        return f"Provide intermediate resources in {struggle_area}."
-    else:
-        return "Provide advanced resources."
-
 # Streamlit UI
 st.set_page_config(page_title="Learning Path Recommendations", layout="wide")
+page_profiler("app")
 
 st.title('🎓 Personalized Learning Path Recommendations')
 
+# Roster source: the example data or the full student dataset
+roster_source = st.sidebar.radio("Roster", ["Example data", "student-dataset.csv"])
+with span("load roster"):
+    if roster_source == "student-dataset.csv":
+        data = load_dataset_roster(os.stat(DATASET_PATH).st_mtime_ns)
+
+    saved_version = store.versions['student_performance']
+    saved_students = load_saved_students(saved_version)
+    if not saved_students.empty:
+        data = pd.concat([data, saved_students], ignore_index=True)
+
+    # Students added in this session that the store's writer has not committed yet
+    st.session_state.pending_students = [(sequence, row) for sequence, row in st.session_state.get('pending_students', []) if sequence > saved_version]
+    if st.session_state.pending_students:
+        data = pd.concat([data, pd.DataFrame([row for _, row in st.session_state.pending_students])], ignore_index=True)
+
 # Sidebar for adding new student data
 st.sidebar.header('📚 Add New Student Performance Data')
 student_name = st.sidebar.text_input("Student Name", "")
@@ -38,32 +68,47 @@ if st.sidebar.button("Add Student"):
             'Struggles_with': [struggle_area]
         })
         data = pd.concat([data, new_data], ignore_index=True)
+        # Written in the background; until then later reruns show the student from session state
+        sequence = store.add_student(student_name, score, struggle_area)
+        st.session_state.pending_students.append((sequence, new_data.iloc[0].to_dict()))
         st.sidebar.success(f"Added data for {student_name}.")
 
 # Apply recommendations
-data['Recommendation'] = data.apply(lambda x: recommend_resources(x['Score'], x['Struggles_with']), axis=1)
+with span("recommendations"):
+    data['Recommendation'] = recommend_batch(data['Score'], data['Struggles_with'])
 
-# Display data and recommendations
+# Display data and recommendations, one page of the roster at a time
 st.subheader('📊 Student Performance Data')
-st.dataframe(data.style.applymap(lambda x: 'background-color: #d3f8e2' if x == 'Provide advanced resources.' else '', subset=['Recommendation']))
+pages = page_count(len(data), ROWS_PER_PAGE)
+st.session_state.roster_page = min(st.session_state.get('roster_page', 1), pages)
+page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="roster_page")
+window = frame_page(data, page, ROWS_PER_PAGE)
+
+# Students ready for advanced resources are flagged by a column, not by per-cell styling
+with span("roster table"):
+    st.dataframe(
+        window.assign(Advanced=window['Recommendation'] == ADVANCED_RECOMMENDATION),
+        column_config={
+            "Score": st.column_config.ProgressColumn("Score", format="%.1f", min_value=0, max_value=100),
+            "Advanced": st.column_config.CheckboxColumn("Advanced ✨"),
+        },
+        hide_index=True,
+        width='stretch',
+    )
+st.caption(f"Showing students {(page - 1) * ROWS_PER_PAGE + 1}-{(page - 1) * ROWS_PER_PAGE + len(window)} of {len(data)}")
 
 st.subheader('🔍 Recommendations')
-for _, row in data.iterrows():
-    st.write(f"**Student:** {row['Student']}  \n**Recommendation:** {row['Recommendation']}")
+with span("recommendation list"):
+    st.markdown(recommendations_markdown(window['Student'], window['Recommendation']))
 
 # Create a bar chart for scores
 st.subheader('📈 Score Distribution')
-fig, ax = plt.subplots()
-sns.barplot(x='Student', y='Score', data=data, ax=ax, palette='viridis')
-ax.set_title('Score Distribution by Student')
-ax.set_xlabel('Student')
-ax.set_ylabel('Score')
-st.pyplot(fig)
+with span("score chart"):
+    st.image(score_distribution_chart(data))
 
 # Create a pie chart for struggle areas
 st.subheader('🍰 Struggle Areas Distribution')
-fig, ax = plt.subplots()
-struggle_counts = data['Struggles_with'].value_counts()
-ax.pie(struggle_counts, labels=struggle_counts.index, autopct='%1.1f%%', startangle=140, colors=sns.color_palette('pastel'))
-ax.set_title('Distribution of Struggle Areas')
-st.pyplot(fig)
+with span("struggle chart"):
+    st.image(render_chart('struggle_pie', draw_struggle_pie, data[['Struggles_with']]))
+
+profile_panel()
@@ -0,0 +1,337 @@
+"""Headless batch run of recommendations, activity summaries and the class ranking over large CSVs.
+
+    python batch_reports.py student-dataset.csv
+    python batch_reports.py activity_events.csv --chunk-mb 32 --workers 8 --output-dir nightly
+
+The CSV is split into byte ranges of about --chunk-mb on line boundaries. Each worker in a
+process pool reads and parses only its own range and reduces it to partial aggregates, which
+the parent merges as chunks finish. No more than --workers chunks are in flight at once, so peak
+memory follows the chunk size rather than the file size; the merged aggregates grow with the
+number of distinct students, not rows. Rows must not contain embedded line breaks.
+
+Two kinds of input are recognised by their header:
+
+  student-dataset.csv-style rows (id, name, *.grade, ...) write
+    recommendations/part-*.parquet  one row per student, written by the workers as they go
+    subject_summary.parquet         per-subject average, lowest and highest grade (0-100)
+    recommendation_counts.parquet   students per recommendation
+    top_students.parquet            the --top best students by score, ranked
+
+  activity-event rows (student_id, student_name, activity, subject, score, ...) write
+    student_summary.parquet         per-student statistics, class rank and recommendation
+    activity_summary.parquet        per-student, per-activity average and count
+    subject_summary.parquet         per-subject average, lowest and highest score
+"""
+import argparse
+import csv
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+except ImportError:
+    pyarrow = None
+
+from recommendations import recommend_batch
+from student_dataset import GRADE_COLUMNS, normalized_grades, read_dataset_csv, roster_frame
+
+DEFAULT_CHUNK_MB = 64
+DEFAULT_TOP = 100
+
+ACTIVITY_COLUMNS = ['student_id', 'student_name', 'activity', 'subject', 'score']
+
+
+# Byte ranges of about `chunk_bytes` covering every line after the header, each ending on a line break
+def chunk_ranges(path, chunk_bytes):
+    with open(path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            yield start, end
+            start = end
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+    return header_line, next(csv.reader([header_line.decode('utf-8-sig')]), [])
+
+
+def input_kind(columns):
+    if set(GRADE_COLUMNS) <= set(columns):
+        return 'dataset'
+    if {'student_id', 'activity', 'subject', 'score'} <= set(columns):
+        return 'activities'
+    return None
+
+
+# The header plus one byte range of the file, as a file-like object for pandas
+def read_range(path, header_line, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return io.BytesIO(header_line + f.read(end - start))
+
+
+# Worker for student-dataset.csv-style input: write the chunk's recommendations to their own
+# Parquet part and return the chunk's subject totals, recommendation counts and best students
+def dataset_chunk(path, header_line, start, end, part_path, top):
+    dataset = read_dataset_csv(read_range(path, header_line, start, end))
+    roster = roster_frame(dataset)
+    roster.insert(0, 'id', dataset['id'].to_numpy())
+    roster['Recommendation'] = recommend_batch(roster['Score'], roster['Struggles_with']).to_numpy()
+    roster.to_parquet(part_path, index=False)
+
+    grades = normalized_grades(dataset)
+    return {
+        'rows': len(dataset),
+        'subjects': pd.DataFrame({
+            'subject': grades.columns, 'sum': grades.sum().to_numpy(), 'count': grades.count().to_numpy(),
+            'min': grades.min().to_numpy(), 'max': grades.max().to_numpy(),
+        }),
+        'recommendations': roster.groupby('Recommendation', observed=True, as_index=False).size().rename(columns={'Recommendation': 'recommendation', 'size': 'students'}),
+        'top': roster.sort_values(['Score', 'id'], ascending=[False, True]).head(top)[['id', 'Student', 'Score']],
+    }
+
+
+# Worker for activity-event input: per-student, per-activity and per-subject sums and counts.
+# Like the live event feed, rows without a student or a numeric score are skipped.
+def activities_chunk(path, header_line, start, end):
+    frame = pd.read_csv(
+        read_range(path, header_line, start, end),
+        usecols=lambda column: column in ACTIVITY_COLUMNS,
+        dtype={column: 'string' for column in ACTIVITY_COLUMNS if column != 'score'},
+        keep_default_na=False,
+    )
+    frame['score'] = pd.to_numeric(frame['score'], errors='coerce')
+    frame = frame[frame['score'].notna() & (frame['student_id'] != '')]
+    if 'student_name' not in frame:
+        frame['student_name'] = frame['student_id']
+    frame['student_name'] = frame['student_name'].mask(frame['student_name'] == '', frame['student_id'])
+
+    students = frame.groupby('student_id', sort=False, as_index=False).agg(
+        sum=('score', 'sum'), count=('score', 'count'), min=('score', 'min'), max=('score', 'max'), name=('student_name', 'first'),
+    )
+    return {
+        'rows': len(frame),
+        'students': students,
+        'activities': frame.groupby(['student_id', 'activity'], sort=False, as_index=False)['score'].agg(['sum', 'count']),
+        'student_subjects': frame.groupby(['student_id', 'subject'], sort=False, as_index=False)['score'].agg(['sum', 'count']),
+        'subjects': frame.groupby('subject', sort=False, as_index=False)['score'].agg(['sum', 'count', 'min', 'max']),
+    }
+
+
+# Running merge of partial aggregates with key columns `keys`. Partials are buffered and folded
+# together once they hold as many rows as the merged result, so merging n chunks costs
+# O(n log n) key updates instead of re-grouping the whole result after every chunk.
+class PartialAggregate:
+    def __init__(self, keys, how):
+        self.keys = keys
+        self.how = how
+        self.merged = None
+        self.pending = []
+        self.pending_rows = 0
+
+    def add(self, frame):
+        self.pending.append(frame)
+        self.pending_rows += len(frame)
+        if self.merged is None or self.pending_rows >= len(self.merged):
+            self._collapse()
+
+    def _collapse(self):
+        frames = ([self.merged] if self.merged is not None else []) + self.pending
+        combined = pd.concat(frames, ignore_index=True)
+        self.merged = combined.groupby(self.keys, sort=False, as_index=False).agg(self.how)
+        self.pending = []
+        self.pending_rows = 0
+
+    def result(self):
+        if self.pending:
+            self._collapse()
+        return self.merged
+
+
+# The `top` best students by score across chunks, kept in (score desc, id) order
+class TopStudents:
+    def __init__(self, top):
+        self.top = top
+        self.frame = None
+
+    def add(self, frame):
+        combined = frame if self.frame is None else pd.concat([self.frame, frame], ignore_index=True)
+        self.frame = combined.sort_values(['Score', 'id'], ascending=[False, True]).head(self.top).reset_index(drop=True)
+
+    # Competition ranks are exact: every student scoring above a listed one is also listed
+    def result(self):
+        frame = self.frame.copy()
+        frame.insert(0, 'rank', frame['Score'].rank(method='min', ascending=False).astype('int64'))
+        return frame
+
+
+def subject_summary(totals):
+    totals = totals[totals['count'] > 0]
+    return pd.DataFrame({
+        'subject': totals['subject'].astype(str).to_numpy(),
+        'average_score': (totals['sum'] / totals['count']).to_numpy(),
+        'min_score': totals['min'].to_numpy(),
+        'max_score': totals['max'].to_numpy(),
+        'count': totals['count'].to_numpy(dtype='int64'),
+    }).sort_values('subject', ignore_index=True)
+
+
+# Outputs for activity input: overall statistics in StudentIndex's column names, a competition
+# rank by average (ties by student_id, as in ClassRanking) and a recommendation for the
+# student's weakest subject from the same decision tree the roster uses
+def activity_outputs(students, activities, student_subjects):
+    averages = students['sum'] / students['count']
+    summary = pd.DataFrame({
+        'student_id': students['student_id'].to_numpy(),
+        'student_name': students['name'].to_numpy(),
+        'mean_score': averages.to_numpy(),
+        'max_score': students['max'].to_numpy(),
+        'min_score': students['min'].to_numpy(),
+        'total_activities': students['count'].to_numpy(dtype='int64'),
+        'rank': averages.rank(method='min', ascending=False).to_numpy(dtype='int64'),
+    })
+
+    subject_averages = student_subjects[['student_id', 'subject']].assign(average=student_subjects['sum'] / student_subjects['count'])
+    weakest = subject_averages.sort_values(['student_id', 'average', 'subject']).drop_duplicates('student_id').set_index('student_id')['subject']
+    summary['weakest_subject'] = weakest.reindex(summary['student_id']).to_numpy()
+    summary['recommendation'] = recommend_batch(summary['mean_score'], summary['weakest_subject']).astype(str)
+    summary = summary.sort_values(['rank', 'student_id'], ignore_index=True)
+
+    activity_summary = pd.DataFrame({
+        'student_id': activities['student_id'].to_numpy(),
+        'activity': activities['activity'].to_numpy(),
+        'average_score': (activities['sum'] / activities['count']).to_numpy(),
+        'total_count': activities['count'].to_numpy(dtype='int64'),
+    }).sort_values(['student_id', 'activity'], ignore_index=True)
+    return summary, activity_summary
+
+
+# Split `path` into chunks, reduce them on a process pool with at most `max_workers` chunks in
+# flight, merge the partials and write the Parquet outputs; returns {output name: path}
+def run_batch(path, output_dir, chunk_bytes=DEFAULT_CHUNK_MB << 20, max_workers=None, top=DEFAULT_TOP, progress=None):
+    header_line, columns = read_header(path)
+    kind = input_kind(columns)
+    if kind is None:
+        raise ValueError(f"{path}: expected student-dataset.csv columns or activity events ({', '.join(ACTIVITY_COLUMNS)})")
+    max_workers = max_workers or os.cpu_count() or 1
+    ranges = list(chunk_ranges(path, chunk_bytes))
+
+    os.makedirs(output_dir, exist_ok=True)
+    if kind == 'dataset':
+        parts_dir = os.path.join(output_dir, 'recommendations')
+        os.makedirs(parts_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(parts_dir, 'part-*.parquet')):
+            os.remove(stale)
+        merges = {
+            'subjects': PartialAggregate(['subject'], {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}),
+            'recommendations': PartialAggregate(['recommendation'], {'students': 'sum'}),
+            'top': TopStudents(top),
+        }
+    else:
+        merges = {
+            'students': PartialAggregate(['student_id'], {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max', 'name': 'first'}),
+            'activities': PartialAggregate(['student_id', 'activity'], {'sum': 'sum', 'count': 'sum'}),
+            'student_subjects': PartialAggregate(['student_id', 'subject'], {'sum': 'sum', 'count': 'sum'}),
+            'subjects': PartialAggregate(['subject'], {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}),
+        }
+
+    rows = 0
+    done = 0
+    pending = set()
+    remaining = iter(enumerate(ranges))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+
+        def submit_next():
+            chunk = next(remaining, None)
+            if chunk is None:
+                return False
+            number, (start, end) = chunk
+            if kind == 'dataset':
+                part_path = os.path.join(parts_dir, f'part-{number:05d}.parquet')
+                pending.add(pool.submit(dataset_chunk, path, header_line, start, end, part_path, top))
+            else:
+                pending.add(pool.submit(activities_chunk, path, header_line, start, end))
+            return True
+
+        while len(pending) < max_workers and submit_next():
+            pass
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                partial = future.result()
+                rows += partial.pop('rows')
+                for name, frame in partial.items():
+                    if len(frame):
+                        merges[name].add(frame)
+                done += 1
+                if progress is not None:
+                    progress(done, len(ranges))
+                submit_next()
+
+    outputs = {}
+
+    def write(name, frame):
+        outputs[name] = os.path.join(output_dir, f'{name}.parquet')
+        frame.to_parquet(outputs[name], index=False)
+
+    if kind == 'dataset':
+        outputs['recommendations'] = parts_dir
+        if rows:
+            write('subject_summary', subject_summary(merges['subjects'].result()))
+            counts = merges['recommendations'].result().astype({'recommendation': str, 'students': 'int64'})
+            write('recommendation_counts', counts.sort_values(['students', 'recommendation'], ascending=[False, True], ignore_index=True))
+            write('top_students', merges['top'].result())
+    elif rows:
+        summary, activity_summary = activity_outputs(*(merges[name].result() for name in ('students', 'activities', 'student_subjects')))
+        write('student_summary', summary)
+        write('activity_summary', activity_summary)
+        write('subject_summary', subject_summary(merges['subjects'].result()))
+    return {'kind': kind, 'rows': rows, 'chunks': len(ranges), 'outputs': outputs}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="student-dataset.csv-style or activity-event CSV")
+    parser.add_argument('--output-dir', default='batch-output')
+    parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_MB, help="approximate size of each chunk read by a worker")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="students listed in top_students.parquet")
+    parser.add_argument('--quiet', action='store_true', help="no per-chunk progress")
+    args = parser.parse_args(argv)
+    if pyarrow is None:
+        parser.error("writing Parquet needs pyarrow (pip install pyarrow)")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} chunks", end='' if done < total else '\n', file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    try:
+        result = run_batch(
+            args.input, args.output_dir, int(args.chunk_mb * (1 << 20)), args.workers, args.top,
+            progress=None if args.quiet else progress,
+        )
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    print(f"{result['kind']}: {result['rows']:,} rows in {result['chunks']} chunks, {time.perf_counter() - started:.1f} s")
+    for name, path in result['outputs'].items():
+        print(f"    {name:<24} {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
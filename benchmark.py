@@ -0,0 +1,398 @@
+"""Benchmarks for the compute paths behind each page, on synthetic data at several sizes.
+
+    python benchmark.py --activity-sizes 10000 100000 1000000 --dataset-sizes 10000 1000000
+    python benchmark.py --stages class_ranking --baseline old.json --output new.json
+
+Every stage is timed over fresh setups and run once more under tracemalloc for its peak
+Python/numpy allocation; results are written as JSON so runs from different commits can be compared.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from activity_stream import ActivityBuffer
+from charts import CHART_CACHE, score_distribution_chart, subject_score_chart
+from class_ranking import ClassRanking
+from cohort_cube import CohortCube
+from geo_index import GeoGridIndex
+from leaderboard import Leaderboard
+from poll_tally import PollTally, results_frame
+from progress_trends import TrendTracker, trend_frame
+from question_bank import parse_questions_bytes
+from recommendations import recommend_batch, recommend_resources
+from report_cards import render_report_card
+from similar_students import SimilarityIndex
+from student_dataset import load_student_dataset, read_dataset_csv, roster_frame
+from student_index import StudentIndex
+from synthetic_data import synthetic_activities, synthetic_dataset, synthetic_questions_csv, synthetic_roster, write_dataset_csv
+
+ACTIVITIES_PER_STUDENT = 10
+LOOKUPS = 1000
+RANKING_UPDATES = 10000
+NEIGHBOUR_QUERIES = 1000
+
+# name -> (fixture family, stage); a stage takes the fixtures and returns the callable to time,
+# so any setup it needs (and any state it mutates) is rebuilt outside the measurement
+STAGES = {}
+
+
+def stage(name, family):
+    def register(func):
+        STAGES[name] = (family, func)
+        return func
+    return register
+
+
+def activity_fixtures(n_activities, workdir):
+    activities = synthetic_activities(n_activities, max(n_activities // ACTIVITIES_PER_STUDENT, 1))
+    index = StudentIndex(activities)
+    busiest = max(index.positions, key=lambda student_id: len(index.positions[student_id]))
+    rng = np.random.default_rng(1)
+    return {
+        'activities': activities,
+        'index': index,
+        'busiest': busiest,
+        'lookup_ids': rng.choice(index.student_ids(), LOOKUPS),
+        'roster': synthetic_roster(len(index.positions)),
+        'questions_csv': synthetic_questions_csv(max(n_activities // ACTIVITIES_PER_STUDENT, 1)),
+    }
+
+
+def dataset_fixtures(n_rows, workdir):
+    path = os.path.join(workdir, f'student-dataset-{n_rows}.csv')
+    write_dataset_csv(synthetic_dataset(n_rows), path)
+    cache_dir = os.path.join(workdir, 'cache')
+    dataset = load_student_dataset(path, cache_dir)  # also warms the Arrow cache
+    return {'path': path, 'cache_dir': cache_dir, 'dataset': dataset}
+
+
+FIXTURES = {'activities': activity_fixtures, 'dataset': dataset_fixtures}
+
+
+# app.py
+@stage('recommend_apply', 'activities')
+def bench_recommend_apply(fx):
+    roster = fx['roster']
+    return lambda: roster.apply(lambda row: recommend_resources(row['Score'], row['Struggles_with']), axis=1)
+
+
+@stage('recommend_batch', 'activities')
+def bench_recommend_batch(fx):
+    roster = fx['roster']
+    return lambda: recommend_batch(roster['Score'], roster['Struggles_with'])
+
+
+@stage('score_distribution_chart', 'activities')
+def bench_score_distribution_chart(fx):
+    CHART_CACHE.clear()
+    roster = fx['roster']
+    return lambda: score_distribution_chart(roster)
+
+
+# pages/ap.py
+@stage('student_filter_groupby', 'activities')
+def bench_student_filter_groupby(fx):
+    activities, lookup_ids = fx['activities'], fx['lookup_ids'][:20]
+
+    def run():
+        for student_id in lookup_ids:
+            student_data = activities[activities['student_id'] == student_id]
+            student_data.groupby('activity')['score'].agg(['mean', 'count'])
+    return run
+
+
+@stage('student_index_build', 'activities')
+def bench_student_index_build(fx):
+    activities = fx['activities']
+    return lambda: StudentIndex(activities)
+
+
+@stage('student_index_lookups', 'activities')
+def bench_student_index_lookups(fx):
+    index, lookup_ids = fx['index'], fx['lookup_ids']
+
+    def run():
+        for student_id in lookup_ids:
+            index.student_rows(student_id)
+            index.activity_summary(student_id)
+            index.overall_stats(student_id)
+    return run
+
+
+@stage('class_ranking_build', 'activities')
+def bench_class_ranking_build(fx):
+    activities = fx['activities']
+    return lambda: ClassRanking.from_frame(activities)
+
+
+@stage('class_ranking_updates', 'activities')
+def bench_class_ranking_updates(fx):
+    ranking = ClassRanking.from_frame(fx['activities'])
+    rng = np.random.default_rng(2)
+    student_ids = rng.choice(fx['index'].student_ids(), RANKING_UPDATES)
+    scores = rng.integers(0, 101, RANKING_UPDATES)
+
+    def run():
+        for student_id, score in zip(student_ids, scores):
+            ranking.add_score(student_id, score)
+        ranking.topper()
+    return run
+
+
+@stage('trend_frame', 'activities')
+def bench_trend_frame(fx):
+    activities = fx['activities']
+    return lambda: trend_frame(activities)
+
+
+@stage('trend_tracker_build', 'activities')
+def bench_trend_tracker_build(fx):
+    activities = fx['activities']
+    return lambda: TrendTracker.from_frame(activities)
+
+
+@stage('leaderboard_build', 'activities')
+def bench_leaderboard_build(fx):
+    activities = fx['activities']
+    return lambda: Leaderboard.from_frame(activities)
+
+
+@stage('leaderboard_queries', 'activities')
+def bench_leaderboard_queries(fx):
+    leaderboard, lookup_ids = Leaderboard.from_frame(fx['activities']), fx['lookup_ids']
+
+    def run():
+        for student_id in lookup_ids:
+            leaderboard.standings(student_id)
+        for dimension in ('subject', 'activity'):
+            leaderboard.percentiles(dimension)
+            for group in leaderboard.groups(dimension):
+                leaderboard.top_k(dimension, group, 10)
+    return run
+
+
+@stage('activity_buffer_append', 'activities')
+def bench_activity_buffer_append(fx):
+    activities = fx['activities']
+    batches = [activities.iloc[start:start + 1000] for start in range(0, len(activities), 1000)]
+
+    def run():
+        buffer = ActivityBuffer(activities.iloc[:0])
+        for batch in batches:
+            buffer.append(batch)
+        buffer.frame()
+    return run
+
+
+@stage('subject_score_chart', 'activities')
+def bench_subject_score_chart(fx):
+    CHART_CACHE.clear()
+    student_data = fx['index'].student_rows(fx['busiest'])
+    return lambda: subject_score_chart(student_data, fx['index'].names[fx['busiest']])
+
+
+@stage('generate_pdf', 'activities')
+def bench_generate_pdf(fx):
+    student_data = fx['index'].student_rows(fx['busiest'])
+    return lambda: render_report_card(student_data, fx['index'].names[fx['busiest']])
+
+
+# pages/new2.py
+@stage('question_import', 'activities')
+def bench_question_import(fx):
+    data = fx['questions_csv']
+    return lambda: parse_questions_bytes(data)
+
+
+@stage('poll_tally', 'activities')
+def bench_poll_tally(fx):
+    tally = PollTally()
+    rng = np.random.default_rng(3)
+    n_responses = len(fx['roster'])
+    questions = rng.integers(0, 50, n_responses)
+    options = rng.integers(0, 4, n_responses)
+
+    def run():
+        for question, option in zip(questions, options):
+            tally.record(int(question), f"Question {question}?", int(option), option == 0)
+        results_frame(tally.snapshot())
+    return run
+
+
+# student-dataset.csv pages
+@stage('dataset_csv_parse', 'dataset')
+def bench_dataset_csv_parse(fx):
+    path = fx['path']
+    return lambda: read_dataset_csv(path)
+
+
+@stage('dataset_cached_load', 'dataset')
+def bench_dataset_cached_load(fx):
+    path, cache_dir = fx['path'], fx['cache_dir']
+    return lambda: load_student_dataset(path, cache_dir)
+
+
+@stage('dataset_recommendations', 'dataset')
+def bench_dataset_recommendations(fx):
+    dataset = fx['dataset']
+
+    def run():
+        roster = roster_frame(dataset)
+        recommend_batch(roster['Score'], roster['Struggles_with'])
+    return run
+
+
+@stage('cohort_cube_build', 'dataset')
+def bench_cohort_cube_build(fx):
+    dataset = fx['dataset']
+    return lambda: CohortCube.from_frame(dataset)
+
+
+@stage('cohort_rollup', 'dataset')
+def bench_cohort_rollup(fx):
+    cube = CohortCube.from_frame(fx['dataset'])
+    return lambda: cube.rollup(by=['nationality', 'gender'])
+
+
+@stage('similarity_index_build', 'dataset')
+def bench_similarity_index_build(fx):
+    dataset = fx['dataset']
+    return lambda: SimilarityIndex(dataset)
+
+
+@stage('similarity_neighbours', 'dataset')
+def bench_similarity_neighbours(fx):
+    index = SimilarityIndex(fx['dataset'])
+    positions = np.random.default_rng(4).integers(0, len(index), NEIGHBOUR_QUERIES)
+    return lambda: index.neighbours(positions, k=5)
+
+
+@stage('geo_index_build', 'dataset')
+def bench_geo_index_build(fx):
+    dataset = fx['dataset']
+    return lambda: GeoGridIndex(dataset['latitude'], dataset['longitude'])
+
+
+@stage('geo_radius_and_clusters', 'dataset')
+def bench_geo_radius_and_clusters(fx):
+    dataset = fx['dataset']
+    index = GeoGridIndex(dataset['latitude'], dataset['longitude'])
+    latitude, longitude = float(dataset['latitude'].iat[0]), float(dataset['longitude'].iat[0])
+
+    def run():
+        index.radius(latitude, longitude, 50)
+        index.clusters(4)
+    return run
+
+
+def time_stage(func, fixtures, repeat):
+    timings = []
+    for _ in range(repeat):
+        run = func(fixtures)
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(func, fixtures):
+    run = func(fixtures)
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(activity_sizes, dataset_sizes, stages=None, repeat=3, memory=True, log=print):
+    sizes = {'activities': activity_sizes, 'dataset': dataset_sizes}
+    selected = {name: entry for name, entry in STAGES.items() if stages is None or any(name.startswith(prefix) for prefix in stages)}
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for family, build in FIXTURES.items():
+            family_stages = {name: func for name, (stage_family, func) in selected.items() if stage_family == family}
+            if not family_stages:
+                continue
+            for size in sizes[family]:
+                log(f"{family} @ {size:,}: building fixtures")
+                fixtures = build(size, workdir)
+                for name, func in family_stages.items():
+                    timings = time_stage(func, fixtures, repeat)
+                    result = {
+                        'stage': name,
+                        'family': family,
+                        'size': size,
+                        'seconds_min': min(timings),
+                        'seconds_median': statistics.median(timings),
+                        'peak_bytes': peak_memory(func, fixtures) if memory else None,
+                    }
+                    results.append(result)
+                    peak = '' if result['peak_bytes'] is None else f"  peak {result['peak_bytes'] / 2**20:9.1f} MiB"
+                    log(f"  {name:<28} {result['seconds_min']:10.4f} s{peak}")
+                del fixtures
+    return results
+
+
+# Per-stage ratios of minimum times against a previous results file
+def compare(results, baseline):
+    previous = {(row['stage'], row['size']): row for row in baseline['results']}
+    rows = []
+    for row in results:
+        before = previous.get((row['stage'], row['size']))
+        if before and before['seconds_min'] > 0:
+            rows.append((row['stage'], row['size'], before['seconds_min'], row['seconds_min'], row['seconds_min'] / before['seconds_min']))
+    return pd.DataFrame(rows, columns=['stage', 'size', 'baseline_seconds', 'seconds', 'ratio'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--activity-sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help="activity rows; students are a tenth of that")
+    parser.add_argument('--dataset-sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help="student-dataset.csv rows")
+    parser.add_argument('--stages', nargs='+', help="only run stages whose names start with one of these")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.activity_sizes, args.dataset_sizes, args.stages, args.repeat, not args.no_memory)
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(results, json.load(f)).to_string(index=False, float_format='{:.4f}'.format))
+
+
+if __name__ == '__main__':
+    main()
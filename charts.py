@@ -0,0 +1,215 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+# Plotting libraries are imported when the first chart is drawn, not when a page imports this module
+sns = lazy_import('seaborn')
+mpl_figure = lazy_import('matplotlib.figure')
+
+# Upper bound on rendered chart bytes kept in memory per process
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Above this many rows, charts switch from one mark per student or score to server-side bins
+AGGREGATE_ROW_THRESHOLD = 300
+SCORE_BIN_WIDTH = 10
+MAX_CATEGORIES = 12
+OTHER_LABEL = "Other"
+
+
+# Least-recently-used cache of rendered chart bytes, capped by total size
+class ChartCache:
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = image
+            self.total_bytes += len(image)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+CHART_CACHE = ChartCache()
+
+
+# Cache key from the chart name, the contents of the plotted data and the drawing parameters
+def chart_key(name, data, fmt, params):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((name, fmt, sorted(params.items()), list(data.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Render a chart to PNG/SVG bytes, reusing an earlier rendering of the same data and parameters.
+# `draw(fig, data, **params)` draws onto a standalone Figure that is released as soon as it is saved,
+# so nothing accumulates in pyplot's global figure registry.
+def render_chart(name, draw, data, fmt='png', figsize=None, cache=None, **params):
+    cache = CHART_CACHE if cache is None else cache
+    key = chart_key(name, data, fmt, dict(params, figsize=figsize))
+    image = cache.get(key)
+    if image is not None:
+        return image
+
+    fig = mpl_figure.Figure(figsize=figsize)
+    try:
+        draw(fig, data, **params)
+        buffer = BytesIO()
+        fig.savefig(buffer, format=fmt, bbox_inches='tight')
+    finally:
+        fig.clear()
+    image = buffer.getvalue()
+    cache.put(key, image)
+    return image
+
+
+# Bar chart of each student's score
+def draw_score_bar(fig, data):
+    ax = fig.subplots()
+    sns.barplot(x='Student', y='Score', data=data, ax=ax, palette='viridis')
+    ax.set_title('Score Distribution by Student')
+    ax.set_xlabel('Student')
+    ax.set_ylabel('Score')
+
+
+# Pie chart of struggle areas
+def draw_struggle_pie(fig, data):
+    ax = fig.subplots()
+    struggle_counts = data['Struggles_with'].value_counts()
+    ax.pie(struggle_counts, labels=struggle_counts.index, autopct='%1.1f%%', startangle=140, colors=sns.color_palette('pastel'))
+    ax.set_title('Distribution of Struggle Areas')
+
+
+# Histogram with subjects on x-axis and marks on y-axis
+def draw_score_histogram(fig, student_data, student_name):
+    ax = fig.subplots()
+    sns.histplot(data=student_data, x='subject', hue='score', multiple='stack', palette='viridis', binwidth=1, kde=False, ax=ax)
+    ax.set_title(f"Score Distribution for {student_name}", fontsize=16, fontweight='bold', color='darkblue')
+    ax.set_xlabel("Subject", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Marks", fontsize=12, fontweight='bold')
+    ax.tick_params(axis='x', labelrotation=45, labelsize=10)
+    ax.tick_params(axis='y', labelsize=10)
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+
+# Bin edges covering 0-100 (or the observed range, if wider) in steps of `bin_width`
+def score_edges(scores, bin_width=SCORE_BIN_WIDTH):
+    low = min(0.0, np.floor(scores.min())) if len(scores) else 0.0
+    high = max(100.0, np.ceil(scores.max())) if len(scores) else 100.0
+    return np.arange(low, high + bin_width, bin_width)
+
+
+def bin_labels(edges):
+    return [f"{start:g}-{stop:g}" for start, stop in zip(edges[:-1], edges[1:])]
+
+
+# Score histogram computed with NumPy: one row per bin with its label and count
+def score_bins(scores, bin_width=SCORE_BIN_WIDTH):
+    scores = np.asarray(scores, dtype=float)
+    scores = scores[~np.isnan(scores)]
+    counts, edges = np.histogram(scores, bins=score_edges(scores, bin_width))
+    return pd.DataFrame({'bin': bin_labels(edges), 'count': counts})
+
+
+# Integer codes for `values` keeping the `max_categories` most frequent ones and folding the rest into "Other"
+def top_categories(values, max_categories=MAX_CATEGORIES):
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if len(uniques) <= max_categories:
+        return codes, list(uniques)
+    keep = np.argpartition(-counts, max_categories - 1)[:max_categories]
+    keep = keep[np.argsort(-counts[keep], kind='stable')]
+    mapping = np.full(len(uniques), max_categories)
+    mapping[keep] = np.arange(max_categories)
+    return np.where(codes >= 0, mapping[codes], -1), list(uniques[keep]) + [OTHER_LABEL]
+
+
+# Counts per (subject, score bin), with subjects capped to the most frequent ones:
+# one row per subject and one column per score bin
+def subject_score_bins(student_data, bin_width=SCORE_BIN_WIDTH, max_categories=MAX_CATEGORIES):
+    subject_codes, subjects = top_categories(student_data['subject'], max_categories)
+    scores = student_data['score'].to_numpy(dtype=float)
+    valid = (subject_codes >= 0) & ~np.isnan(scores)
+    edges = score_edges(scores[valid], bin_width)
+    n_bins = len(edges) - 1
+    bin_codes = np.clip(np.searchsorted(edges, scores[valid], side='right') - 1, 0, n_bins - 1)
+    counts = np.bincount(subject_codes[valid] * n_bins + bin_codes, minlength=len(subjects) * n_bins)
+    binned = pd.DataFrame(counts.reshape(len(subjects), n_bins), columns=bin_labels(edges))
+    binned.insert(0, 'subject', [str(subject) for subject in subjects])
+    return binned
+
+
+# Histogram of binned scores
+def draw_score_bins(fig, binned):
+    ax = fig.subplots()
+    ax.bar(binned['bin'], binned['count'], color=sns.color_palette('viridis', len(binned)))
+    ax.set_title('Score Distribution (binned)')
+    ax.set_xlabel('Score')
+    ax.set_ylabel('Number of Students')
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+# Stacked bars of score bins per subject
+def draw_subject_score_bins(fig, binned, student_name):
+    ax = fig.subplots()
+    bin_columns = binned.columns[1:]
+    bottom = np.zeros(len(binned))
+    for color, score_bin in zip(sns.color_palette('viridis', len(bin_columns)), bin_columns):
+        counts = binned[score_bin].to_numpy()
+        ax.bar(binned['subject'], counts, bottom=bottom, color=color, label=score_bin)
+        bottom += counts
+    ax.legend(title='Score', fontsize=8)
+    ax.set_title(f"Score Distribution for {student_name}", fontsize=16, fontweight='bold', color='darkblue')
+    ax.set_xlabel("Subject", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Activities", fontsize=12, fontweight='bold')
+    ax.tick_params(axis='x', labelrotation=45, labelsize=10)
+    ax.tick_params(axis='y', labelsize=10)
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+
+# Score distribution for the roster: one bar per student for small classes, a binned histogram otherwise
+def score_distribution_chart(data, row_threshold=AGGREGATE_ROW_THRESHOLD):
+    if len(data) > row_threshold:
+        return render_chart('score_bins', draw_score_bins, score_bins(data['Score']))
+    return render_chart('score_bar', draw_score_bar, data[['Student', 'Score']])
+
+
+# Per-subject score chart for one student, switching to binned scores for long histories
+def subject_score_chart(student_data, student_name, row_threshold=AGGREGATE_ROW_THRESHOLD):
+    if len(student_data) > row_threshold:
+        binned = subject_score_bins(student_data)
+        return render_chart('subject_score_bins', draw_subject_score_bins, binned, figsize=(12, 6), student_name=student_name)
+    return render_chart('score_histogram', draw_score_histogram, student_data[['subject', 'score']], figsize=(12, 6), student_name=student_name)
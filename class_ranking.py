@@ -0,0 +1,95 @@
+from bisect import bisect_left, insort
+
+import pandas as pd
+
+
+# Class ranking by average score, kept in order as scores are appended.
+# Students are ordered by average (highest first) and then by student_id, so ties always
+# come out in the same order no matter when the scores arrived.
+class ClassRanking:
+    def __init__(self):
+        self.sums = {}
+        self.counts = {}
+        self.names = {}
+        self._order = []          # sorted (-average, student_id) keys
+        self._averages = []       # sorted distinct -average values, for dense ranks
+        self._average_counts = {}  # -average -> number of students holding it
+
+    @classmethod
+    def from_frame(cls, df):
+        ranking = cls()
+        grouped = df.groupby('student_id', sort=False)
+        totals = grouped['score'].agg(['sum', 'count'])
+        ranking.sums = totals['sum'].astype(float).to_dict()
+        ranking.counts = totals['count'].to_dict()
+        ranking.names = grouped['student_name'].first().to_dict()
+
+        # Initial order comes from a single sort; after that only appends move students
+        ranking._order = sorted((-ranking.average(student_id), student_id) for student_id in ranking.sums)
+        ranking._average_counts = pd.Series([key for key, _ in ranking._order], dtype=float).value_counts().to_dict()
+        ranking._averages = sorted(ranking._average_counts)
+        return ranking
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, student_id):
+        return student_id in self.sums
+
+    def average(self, student_id):
+        return self.sums[student_id] / self.counts[student_id]
+
+    # Record one new score and move the student to their new position
+    def add_score(self, student_id, score, student_name=None):
+        if student_id in self.sums:
+            self._remove_key(-self.average(student_id), student_id)
+        else:
+            self.sums[student_id] = 0.0
+            self.counts[student_id] = 0
+        self.sums[student_id] += float(score)
+        self.counts[student_id] += 1
+        if student_name is not None:
+            self.names[student_id] = student_name
+        self._insert_key(-self.average(student_id), student_id)
+
+    def topper(self):
+        if not self._order:
+            return None
+        return self._entry(self._order[0])
+
+    def top_k(self, k):
+        return [self._entry(key) for key in self._order[:k]]
+
+    # Competition ranks share a position and skip the following ones (1, 2, 2, 4);
+    # dense ranks do not skip (1, 2, 2, 3)
+    def rank(self, student_id, method='competition'):
+        key = -self.average(student_id)
+        if method == 'competition':
+            return bisect_left(self._order, (key,)) + 1
+        elif method == 'dense':
+            return bisect_left(self._averages, key) + 1
+        raise ValueError(f"Unknown rank method: {method}")
+
+    def _entry(self, key):
+        student_id = key[1]
+        return {
+            'student_id': student_id,
+            'student_name': self.names.get(student_id, student_id),
+            'average_score': -key[0],
+            'rank': self.rank(student_id),
+        }
+
+    def _insert_key(self, key, student_id):
+        insort(self._order, (key, student_id))
+        if key in self._average_counts:
+            self._average_counts[key] += 1
+        else:
+            self._average_counts[key] = 1
+            insort(self._averages, key)
+
+    def _remove_key(self, key, student_id):
+        del self._order[bisect_left(self._order, (key, student_id))]
+        self._average_counts[key] -= 1
+        if not self._average_counts[key]:
+            del self._average_counts[key]
+            del self._averages[bisect_left(self._averages, key)]
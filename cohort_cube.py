@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from student_dataset import GRADE_COLUMNS
+
+DIMENSIONS = ['nationality', 'gender', 'ethnic.group', 'age_band']
+MEASURES = GRADE_COLUMNS
+UNKNOWN = "Unknown"
+
+AGE_BAND_EDGES = [0, 20, 22, 24, 26, np.inf]
+AGE_BAND_LABELS = ['<20', '20-21', '22-23', '24-25', '26+']
+
+
+# Dimension values per student, with missing values labelled "Unknown" so they form their own cells
+def cohort_keys(dataset):
+    keys = pd.DataFrame(index=dataset.index)
+    for dimension in DIMENSIONS[:-1]:
+        keys[dimension] = dataset[dimension].astype(object).where(dataset[dimension].notna(), UNKNOWN).astype(str)
+    bands = pd.cut(dataset['age'].astype(float), AGE_BAND_EDGES, right=False, labels=AGE_BAND_LABELS)
+    keys['age_band'] = bands.astype(object).where(bands.notna(), UNKNOWN).astype(str)
+    return keys
+
+
+# Count, sum and sum of squares of every grade per cohort cell
+def cell_aggregates(dataset):
+    keys = cohort_keys(dataset)
+    values = dataset[MEASURES].astype(float)
+    parts = {'students': pd.Series(1, index=dataset.index)}
+    for measure in MEASURES:
+        present = values[measure].notna()
+        parts[f'{measure}:n'] = present.astype(float)
+        parts[f'{measure}:sum'] = values[measure].fillna(0.0)
+        parts[f'{measure}:sumsq'] = values[measure].fillna(0.0) ** 2
+    frame = pd.concat([keys, pd.DataFrame(parts)], axis=1)
+    return frame.groupby(DIMENSIONS, sort=True).sum()
+
+
+# Aggregation cube over the student dataset's demographic dimensions.
+# Only per-cell count, sum and sum of squares are stored; mean and variance of any roll-up are
+# derived from those, so queries touch the (small) set of cells and never the student rows.
+class CohortCube:
+    def __init__(self, cells=None):
+        self.cells = cells if cells is not None else cell_aggregates(pd.DataFrame(columns=DIMENSIONS[:-1] + ['age'] + MEASURES))
+
+    @classmethod
+    def from_frame(cls, dataset):
+        return cls(cell_aggregates(dataset))
+
+    # Fold newly added students into the cube; cost depends on the new rows and the cell count only
+    def append(self, rows):
+        self.cells = self.cells.add(cell_aggregates(rows), fill_value=0.0).sort_index()
+
+    def dimension_values(self, dimension):
+        return sorted(self.cells.index.unique(level=dimension))
+
+    # Mean, standard deviation and count of every grade, grouped by `by` (a subset of DIMENSIONS)
+    # after restricting each dimension in `filters` to the given value or list of values
+    def rollup(self, by=(), filters=None):
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension, allowed in (filters or {}).items():
+            allowed = [allowed] if isinstance(allowed, str) else list(allowed)
+            if allowed:
+                mask &= cells.index.get_level_values(dimension).isin(allowed)
+        cells = cells[mask]
+
+        if by:
+            totals = cells.groupby(level=list(by), sort=True).sum()
+        else:
+            totals = cells.sum().to_frame('All').T
+
+        result = pd.DataFrame({'students': totals['students'].astype(int)}, index=totals.index)
+        for measure in MEASURES:
+            n = totals[f'{measure}:n']
+            mean = totals[f'{measure}:sum'] / n.where(n > 0)
+            variance = (totals[f'{measure}:sumsq'] - n * mean ** 2) / (n - 1).where(n > 1)
+            result[f'{measure} mean'] = mean
+            result[f'{measure} std'] = np.sqrt(variance.clip(lower=0.0))
+        return result
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+# Grid cells per 256px map tile when clustering, roughly one cluster per 64px
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# Uniform latitude/longitude grid over point positions.
+# Points are sorted by cell id, so each grid row of a query rectangle is one contiguous slice found
+# with searchsorted; only points in candidate cells are checked against the exact shape.
+class GeoGridIndex:
+    def __init__(self, latitudes, longitudes, cell_degrees=1.0):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.cell_degrees = cell_degrees
+        self.n_rows = int(np.ceil(180 / cell_degrees)) + 1
+        self.n_cols = int(np.ceil(360 / cell_degrees)) + 1
+
+        valid = np.flatnonzero(~(np.isnan(self.latitudes) | np.isnan(self.longitudes)))
+        cell_ids = self._row(self.latitudes[valid]) * self.n_cols + self._col(self.longitudes[valid])
+        order = np.argsort(cell_ids, kind='stable')
+        self._positions = valid[order]
+        self._cell_ids = cell_ids[order]
+        self._clusters = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _row(self, latitudes):
+        return np.clip(((np.asarray(latitudes) + 90) // self.cell_degrees).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, longitudes):
+        return np.clip(((np.asarray(longitudes) + 180) // self.cell_degrees).astype(np.int64), 0, self.n_cols - 1)
+
+    # Positions in the grid cells overlapping the rectangle; longitudes may wrap the antimeridian
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon):
+        lon_ranges = [(min_lon, max_lon)] if min_lon <= max_lon else [(min_lon, 180.0), (-180.0, max_lon)]
+        rows = np.arange(self._row(min_lat), self._row(max_lat) + 1)
+        slices = []
+        for low, high in lon_ranges:
+            first = rows * self.n_cols + self._col(low)
+            last = rows * self.n_cols + self._col(high)
+            starts = np.searchsorted(self._cell_ids, first, side='left')
+            stops = np.searchsorted(self._cell_ids, last, side='right')
+            slices.extend(self._positions[start:stop] for start, stop in zip(starts, stops) if stop > start)
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    # Positions of the points inside a latitude/longitude box
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lats, lons = self.latitudes[candidates], self.longitudes[candidates]
+        in_lon = (lons >= min_lon) & (lons <= max_lon) if min_lon <= max_lon else (lons >= min_lon) | (lons <= max_lon)
+        return np.sort(candidates[(lats >= min_lat) & (lats <= max_lat) & in_lon])
+
+    # Positions and great-circle distances of the points within `radius_km` of a location, nearest first
+    def radius(self, latitude, longitude, radius_km):
+        lat_span = radius_km / KM_PER_DEGREE
+        min_lat, max_lat = max(-90.0, latitude - lat_span), min(90.0, latitude + lat_span)
+        cos_lat = min(np.cos(np.radians(min_lat)), np.cos(np.radians(max_lat)))
+        if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat <= 0 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            lon_span = radius_km / (KM_PER_DEGREE * cos_lat)
+            min_lon = (longitude - lon_span + 180) % 360 - 180
+            max_lon = (longitude + lon_span + 180) % 360 - 180
+
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        inside = distances <= radius_km
+        order = np.argsort(distances[inside], kind='stable')
+        return candidates[inside][order], distances[inside][order]
+
+    # Points grouped into grid clusters sized for a web-map zoom level, with their centroid,
+    # point count and the mean of each column in `values`; cached per zoom level
+    def clusters(self, zoom, values=None):
+        key = (zoom, None if values is None else tuple(values.columns))
+        if key in self._clusters:
+            return self._clusters[key]
+
+        cell_degrees = 360 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+        lats, lons = self.latitudes[self._positions], self.longitudes[self._positions]
+        cells = ((lats + 90) // cell_degrees).astype(np.int64) * (int(360 / cell_degrees) + 1) + ((lons + 180) // cell_degrees).astype(np.int64)
+        _, cluster_ids = np.unique(cells, return_inverse=True)
+        counts = np.bincount(cluster_ids)
+        clustered = pd.DataFrame({
+            'latitude': np.bincount(cluster_ids, weights=lats) / counts,
+            'longitude': np.bincount(cluster_ids, weights=lons) / counts,
+            'students': counts,
+        })
+        if values is not None:
+            for column in values.columns:
+                column_values = values[column].to_numpy(dtype=np.float64)[self._positions]
+                present = ~np.isnan(column_values)
+                totals = np.bincount(cluster_ids[present], weights=column_values[present], minlength=len(counts))
+                present_counts = np.bincount(cluster_ids[present], minlength=len(counts))
+                clustered[column] = np.divide(totals, present_counts, out=np.full(len(counts), np.nan), where=present_counts > 0)
+        self._clusters[key] = clustered
+        return clustered
+
+
+# Centre of a city, as the mean location of the students who live there
+def city_centre(dataset, city):
+    rows = dataset[dataset['city'] == city]
+    if rows.empty:
+        return None
+    return float(rows['latitude'].astype(float).mean()), float(rows['longitude'].astype(float).mean())
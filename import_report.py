@@ -0,0 +1,114 @@
+"""Import-time report for the app's pages, measured with `python -X importtime`.
+
+    python import_report.py
+    python import_report.py --budget-ms 1500 --strict --json import-times.json
+
+Each page's module-level imports run in a fresh interpreter; the report lists the total import
+time, the heaviest top-level imports and any deferred package that was imported at startup anyway.
+Exits non-zero when a page is over budget (or, with --strict, loads a deferred package), for CI.
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Packages that the pages load on first use (see lazy_imports.py) and should not import at startup
+DEFERRED_PACKAGES = ['matplotlib', 'seaborn', 'reportlab']
+
+
+def page_paths():
+    return [os.path.join(ROOT, 'app.py')] + sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+
+# Source of a page's module-level import statements, in order
+def module_imports(path):
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# (depth, module, self_us, cumulative_us) for each line of `-X importtime` output
+def parse_importtime(stderr):
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if not self_us.strip().isdigit():  # the header line
+            continue
+        module = name.lstrip(' ')
+        entries.append(((len(name) - len(module) - 1) // 2, module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+# Import entries for running `code` in a fresh interpreter, minus the modules the interpreter
+# imports at startup anyway (`exclude`); the fastest of `repeat` runs is kept
+def measure(code, repeat=3, exclude=frozenset()):
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}")
+        entries = [entry for entry in parse_importtime(result.stderr) if entry[1] not in exclude]
+        total = sum(cumulative for depth, _, _, cumulative in entries if depth == 0)
+        if best is None or total < best[0]:
+            best = (total, entries)
+    return best
+
+
+def startup_modules():
+    return frozenset(module for _, module, _, _ in measure('pass', repeat=1)[1])
+
+
+def page_report(path, repeat=3, top=8, exclude=frozenset()):
+    total_us, entries = measure(module_imports(path), repeat, exclude)
+    loaded = {module.split('.')[0] for _, module, _, _ in entries}
+    top_level = sorted((entry for entry in entries if entry[0] == 0), key=lambda entry: -entry[3])
+    return {
+        'page': os.path.relpath(path, ROOT),
+        'total_ms': total_us / 1000,
+        'modules': len(entries),
+        'heaviest': [{'module': module, 'cumulative_ms': cumulative / 1000} for _, module, _, cumulative in top_level[:top]],
+        'deferred_loaded': [package for package in DEFERRED_PACKAGES if package in loaded],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="page scripts (default: app.py and pages/*.py)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per page; the fastest is reported")
+    parser.add_argument('--top', type=int, default=8, help="heaviest imports listed per page")
+    parser.add_argument('--budget-ms', type=float, help="fail if any page's imports take longer than this")
+    parser.add_argument('--strict', action='store_true', help="fail if a page imports a deferred package at startup")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    startup = startup_modules()
+    reports = [page_report(os.path.abspath(path), args.repeat, args.top, startup) for path in (args.pages or page_paths())]
+    failures = []
+    for report in reports:
+        print(f"{report['page']:<24} {report['total_ms']:8.1f} ms  {report['modules']:5d} modules")
+        for entry in report['heaviest']:
+            print(f"    {entry['module']:<32} {entry['cumulative_ms']:8.1f} ms")
+        if report['deferred_loaded']:
+            print(f"    deferred packages loaded at startup: {', '.join(report['deferred_loaded'])}")
+            if args.strict:
+                failures.append(f"{report['page']} imports {', '.join(report['deferred_loaded'])} at startup")
+        if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+            failures.append(f"{report['page']} takes {report['total_ms']:.0f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'pages': reports}, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
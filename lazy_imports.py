@@ -0,0 +1,32 @@
+import importlib
+import sys
+
+
+# Stand-in for a module that is imported on first attribute access, so heavy packages
+# (matplotlib, seaborn, reportlab, PIL) are only paid for by the code paths that use them
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+# The module itself if something already imported it, otherwise a LazyModule for it
+def lazy_import(name):
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
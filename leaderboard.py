@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ('subject', 'activity')
+
+STANDING_COLUMNS = ['average_score', 'rank', 'students', 'percentile']
+
+
+# Running per-student sums for one subject or activity, with derived orderings cached until
+# a new score for this group arrives. Like ActivityBuffer, the arrays keep spare capacity that
+# doubles when full, so adding a new student is amortized O(1) instead of copying the group.
+class _Group:
+    def __init__(self, student_ids, sums, counts, highest):
+        self.size = len(student_ids)
+        capacity = max(16, 1 << max(self.size - 1, 0).bit_length())
+        self._student_ids = np.empty(capacity, dtype=object)
+        self._sums = np.zeros(capacity, dtype=float)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+        self._student_ids[:self.size] = student_ids
+        self._sums[:self.size] = sums
+        self._counts[:self.size] = counts
+        self.positions = {student_id: i for i, student_id in enumerate(self.student_ids)}
+        self.highest = float(highest)
+        self._invalidate()
+
+    @property
+    def student_ids(self):
+        return self._student_ids[:self.size]
+
+    @property
+    def sums(self):
+        return self._sums[:self.size]
+
+    @property
+    def counts(self):
+        return self._counts[:self.size]
+
+    def _invalidate(self):
+        self._sorted = None
+        self._standings = None
+        self._top = {}
+
+    def _grow(self):
+        capacity = 2 * len(self._sums)
+        for name in ('_student_ids', '_sums', '_counts'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype) if array.dtype != object else np.empty(capacity, dtype=object)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, student_id, score):
+        position = self.positions.get(student_id)
+        if position is None:
+            if self.size == len(self._sums):
+                self._grow()
+            position = self.positions[student_id] = self.size
+            self._student_ids[position] = student_id
+            self.size += 1
+        self._sums[position] += score
+        self._counts[position] += 1
+        self.highest = max(self.highest, score)
+        self._invalidate()
+
+    @property
+    def averages(self):
+        return self.sums / self.counts
+
+    # Averages in ascending order, for percentiles and ranks by binary search
+    def sorted_averages(self):
+        if self._sorted is None:
+            self._sorted = np.sort(self.averages)
+        return self._sorted
+
+    # (averages, competition ranks, percentiles) for every student in the group, in position
+    # order, from one searchsorted over the sorted averages
+    def standings(self):
+        if self._standings is None:
+            averages = self.averages
+            at_or_below = np.searchsorted(self.sorted_averages(), averages, side='right')
+            self._standings = (averages, self.size - at_or_below + 1, 100.0 * at_or_below / self.size)
+        return self._standings
+
+    # Positions of the k best averages, highest first (ties by student_id). argpartition finds the
+    # k-th best average in linear time; only the students at or above it are sorted.
+    def top_positions(self, k):
+        k = min(k, self.size)
+        if k not in self._top:
+            averages = self.averages
+            if k == 0:
+                candidates = np.empty(0, dtype=np.int64)
+            elif k < len(averages):
+                kth_best = averages[np.argpartition(-averages, k - 1)[k - 1]]
+                candidates = np.flatnonzero(averages >= kth_best)
+            else:
+                candidates = np.arange(len(averages))
+            order = np.lexsort((self.student_ids[candidates].astype(str), -averages[candidates]))
+            self._top[k] = candidates[order][:k]
+        return self._top[k]
+
+
+# Per-subject and per-activity leaderboards over average scores, with each student's
+# percentile and rank inside every group. Built from a frame in one grouped pass and kept
+# current with add_score; each group only recomputes its orderings after it receives a score.
+class Leaderboard:
+    def __init__(self):
+        self.names = {}
+        self.highest = None
+        self._groups = {dimension: {} for dimension in DIMENSIONS}
+
+    @classmethod
+    def from_frame(cls, df):
+        board = cls()
+        df = df[df['score'].notna()]
+        board.names = df.groupby('student_id', sort=False)['student_name'].first().to_dict()
+        if not df.empty:
+            board.highest = float(df['score'].max())
+        for dimension in DIMENSIONS:
+            totals = df.groupby([dimension, 'student_id'], sort=False)['score'].agg(['sum', 'count'])
+            highest = df.groupby(dimension, sort=False)['score'].max()
+            student_ids = totals.index.get_level_values(1).to_numpy()
+            sums, counts = totals['sum'].to_numpy(dtype=float), totals['count'].to_numpy()
+            for group, rows in totals.groupby(level=0, sort=False).indices.items():
+                board._groups[dimension][group] = _Group(student_ids[rows], sums[rows], counts[rows], highest[group])
+        return board
+
+    def add_score(self, student_id, subject, activity, score, student_name=None):
+        score = float(score)
+        if np.isnan(score):
+            return
+        if student_name is not None:
+            self.names[student_id] = student_name
+        self.highest = score if self.highest is None else max(self.highest, score)
+        for dimension, group in (('subject', subject), ('activity', activity)):
+            if group in self._groups[dimension]:
+                self._groups[dimension][group].add(student_id, score)
+            else:
+                self._groups[dimension][group] = _Group([student_id], [score], [1], score)
+
+    def groups(self, dimension):
+        return sorted(self._groups[dimension], key=str)
+
+    # Highest single mark in the class, or within one subject or activity
+    def highest_score(self, dimension=None, group=None):
+        if dimension is None:
+            return self.highest
+        entry = self._groups[dimension].get(group)
+        return None if entry is None else entry.highest
+
+    # The k best students in a group by average score
+    def top_k(self, dimension, group, k=10):
+        entry = self._groups[dimension].get(group)
+        if entry is None:
+            return pd.DataFrame(columns=['rank', 'student_id', 'student_name', 'average_score'])
+        positions = entry.top_positions(k)
+        averages = entry.averages[positions]
+        student_ids = entry.student_ids[positions]
+        sorted_averages = entry.sorted_averages()
+        return pd.DataFrame({
+            'rank': len(sorted_averages) - np.searchsorted(sorted_averages, averages, side='right') + 1,
+            'student_id': student_ids,
+            'student_name': [self.names.get(student_id, student_id) for student_id in student_ids],
+            'average_score': averages,
+        })
+
+    # One row per group the student has scores in: their average, competition rank, group size and
+    # percentile (the share of the group averaging at or below them)
+    def standings(self, student_id, dimension='subject'):
+        rows = {}
+        for group, entry in self._groups[dimension].items():
+            position = entry.positions.get(student_id)
+            if position is None:
+                continue
+            averages, ranks, percentiles = entry.standings()
+            rows[group] = (averages[position], ranks[position], entry.size, percentiles[position])
+        standings = pd.DataFrame.from_dict(rows, orient='index', columns=STANDING_COLUMNS)
+        standings.index.name = dimension
+        return standings.sort_index(key=lambda index: index.astype(str)).reset_index()
+
+    # Standings of every student in every group of a dimension, one vectorized pass per group
+    def percentiles(self, dimension='subject'):
+        frames = []
+        for group in self.groups(dimension):
+            entry = self._groups[dimension][group]
+            averages, ranks, percentiles = entry.standings()
+            frames.append(pd.DataFrame({
+                dimension: group,
+                'student_id': entry.student_ids,
+                'average_score': averages,
+                'rank': ranks,
+                'students': entry.size,
+                'percentile': percentiles,
+            }))
+        if not frames:
+            return pd.DataFrame(columns=[dimension, 'student_id'] + STANDING_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
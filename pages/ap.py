@@ -1,14 +1,20 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph
-from reportlab.lib import colors
-from reportlab.lib.units import inch  # Ensure this import is included
-from reportlab.lib.styles import getSampleStyleSheet
+import os
+import tempfile
+
+from activity_stream import EVENTS_PATH, ActivityHistory, LiveActivityFeed
+from charts import subject_score_chart
+from lazy_imports import lazy_import
+from leaderboard import DIMENSIONS
+from profiler import page_profiler, profile_panel, profiled, span
+from progress_trends import rolling_means
+from storage import get_store
+from student_dataset import DATASET_PATH, grade_activities, load_student_dataset
+
+# The PDF stack is only loaded when a report card is requested
+report_cards = lazy_import('report_cards')
 
 # Sample data
 data = {
@@ -32,35 +38,110 @@ data = {
 
 df = pd.DataFrame(data)
 
+store = get_store()
+
+# One student's recorded scores, optionally in one subject, read through the (student_id, subject) index
+@st.cache_data(max_entries=64)
+def load_recorded_scores(version, student_id, subject):
+    return store.load_activities(student_id=student_id, subject=subject)
+
+# Grades from student-dataset.csv as activity rows, reparsed only when the file changes
+@st.cache_resource(max_entries=1)
+def load_dataset_activities(mtime_ns):
+    return grade_activities(load_student_dataset(), as_of=pd.Timestamp(mtime_ns, unit='ns').normalize())
+
 # Streamlit UI
 st.set_page_config(page_title="Student Progress Tracker", layout="wide")
+page_profiler("ap")
 
 st.title("Student Progress Tracker 📈")
 
-# Select student
-students = df['student_name'].unique()
-selected_student = st.sidebar.selectbox("Select Student", students)
+# Activity source: the sample activities or the grades in the student dataset
+activity_source = st.sidebar.radio("Activity data", ["Sample activities", "student-dataset.csv grades"])
+with span("load activities"):
+    if activity_source == "student-dataset.csv grades":
+        dataset_mtime_ns = os.stat(DATASET_PATH).st_mtime_ns
+        df = load_dataset_activities(dataset_mtime_ns)
+        source_version = f"dataset-{dataset_mtime_ns}"
+    else:
+        source_version = "sample"
+
+# Activity history of the chosen source plus the scores saved in the store, with the index,
+# ranking, trends and leaderboards derived from it. Built once per source and shared by every
+# session: scores recorded on this page are applied to it in memory, and rows committed to the
+# store elsewhere are read incrementally by sync, only when the activity table's version moves.
+@st.cache_resource(max_entries=2)
+def load_activity_history(source_version, _df):
+    return ActivityHistory(_df, store)
+
+# The same history, also following scores streamed into the event file; each poll only applies
+# the newly appended events
+@st.cache_resource(max_entries=2)
+def load_live_feed(source_version, _df):
+    return LiveActivityFeed(EVENTS_PATH, _df, store)
+
+live_feed_enabled = st.sidebar.toggle("Live activity feed", help=f"Follow new scores appended to {EVENTS_PATH}")
+with span("indexes"):
+    history = load_live_feed(source_version, df) if live_feed_enabled else load_activity_history(source_version, df)
+    history.sync(store)
+    if live_feed_enabled:
+        history.poll()
+
+        # Check the event file in the background and rerun the page only when new rows arrived
+        @st.fragment(run_every="5s")
+        def watch_live_feed(version):
+            history.poll()
+            if history.version != version:
+                st.rerun()
+            st.caption(f"{len(history.df)} activities, following {EVENTS_PATH}")
+
+        with st.sidebar:
+            watch_live_feed(history.version)
+
+    df = history.df
+    student_index = history.student_index
+    class_ranking = history.class_ranking
+    trend_tracker = history.trend_tracker
+    leaderboard = history.leaderboard
+    # The history is shared by every session and updated in place, so these structures are only
+    # read while holding its lock
+    feed_lock = history.lock
+
+# Version of the activity frame: its source (the dataset file's mtime) plus the number of updates
+# the shared history has applied since it was built. Unlike hashing the frame, this costs nothing.
+data_version = f"{source_version}-{'live' if live_feed_enabled else 'history'}-{history.version}"
 
-# Filtering data for selected student
-student_data = df[df['student_name'] == selected_student]
+# Select student
+with feed_lock:
+    selected_student_id = st.sidebar.selectbox("Select Student", student_index.student_ids(), format_func=student_index.names.get)
+    selected_student = student_index.names[selected_student_id]
+    subjects = leaderboard.groups('subject')
+
+# Record a new score for the selected student. It is applied to the shared history at once and
+# written to the store in the background, so the rerun already shows it without waiting on disk.
+with st.sidebar.form("record_score", clear_on_submit=True):
+    st.subheader("📝 Record a Score")
+    new_activity = st.selectbox("Activity", ["quiz", "test", "poll"])
+    new_subject = st.selectbox("Subject", subjects)
+    new_score = st.number_input("Score", min_value=0, max_value=100, value=80)
+    if st.form_submit_button(f"Save score for {selected_student}"):
+        history.record(store, selected_student_id, selected_student, new_activity, new_subject, new_score, pd.Timestamp.now())
+        st.rerun()
+
+# Looking up data for selected student
+with span("student rows"), feed_lock:
+    student_data = student_index.student_rows(selected_student_id)
 
 # Define a function to plot histograms
+@profiled("score chart")
 def plot_histogram(student_data):
     if student_data.empty:
         st.write("No data available for the selected student.")
         return
 
-    # Plotting histogram with subjects on x-axis and marks on y-axis
-    plt.figure(figsize=(12, 6))
-    ax = sns.histplot(data=student_data, x='subject', hue='score', multiple='stack', palette='viridis', binwidth=1, kde=False)
-    
-    ax.set_title(f"Score Distribution for {selected_student}", fontsize=16, fontweight='bold', color='darkblue')
-    ax.set_xlabel("Subject", fontsize=12, fontweight='bold')
-    ax.set_ylabel("Marks", fontsize=12, fontweight='bold')
-    plt.xticks(rotation=45, fontsize=10)
-    plt.yticks(fontsize=10)
-    plt.grid(True, linestyle='--', alpha=0.7)
-    st.pyplot(plt.gcf())
+    # Rendered once per distinct student data and served from the chart cache afterwards;
+    # long histories are binned on the server instead of drawing one hue level per score
+    st.image(subject_score_chart(student_data, selected_student))
 
 # Display progress reports
 st.subheader(f"Score Distribution for {selected_student}")
@@ -69,56 +150,37 @@ plot_histogram(student_data)
 # Display activity summaries
 st.subheader("Activity Summary")
 
-# Group by activity type and show average scores
-activity_summary = student_data.groupby('activity').agg({'score': ['mean', 'count']}).reset_index()
-activity_summary.columns = ['activity', 'average_score', 'total_count']
-
-# Display activity summary with colors
-st.markdown("""
-    <style>
-    .activity-summary {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-    }
-    .activity-card {
-        background-color: #f8f9fa;
-        padding: 15px;
-        margin: 10px;
-        border-radius: 10px;
-        width: 80%;
-        box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.1);
-    }
-    .activity-card h4 {
-        margin: 0;
-        color: #343a40;
-    }
-    .activity-card p {
-        margin: 5px 0;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-for _, row in activity_summary.iterrows():
-    st.markdown(f"""
-        <div class="activity-card">
-            <h4>{row['activity'].capitalize()}</h4>
-            <p><strong>Average Score:</strong> {row['average_score']:.2f}</p>
-            <p><strong>Total Activities:</strong> {row['total_count']}</p>
-        </div>
-    """, unsafe_allow_html=True)
+# Average scores by activity type, precomputed in the index
+with span("activity summary"), feed_lock:
+    activity_summary = student_index.activity_summary(selected_student_id)
+
+# Display the activity summary as one table rather than one HTML card per activity
+with span("activity table"):
+    st.dataframe(
+        activity_summary.assign(activity=activity_summary['activity'].str.capitalize()),
+        column_config={
+            "activity": st.column_config.TextColumn("Activity"),
+            "average_score": st.column_config.ProgressColumn("Average Score", format="%.2f", min_value=0, max_value=100),
+            "total_count": st.column_config.NumberColumn("Total Activities"),
+        },
+        hide_index=True,
+        width='stretch',
+    )
 
 # Display overall statistics
 st.subheader(f"Overall Statistics for {selected_student}")
 
-mean_score = student_data['score'].mean()
-max_score = student_data['score'].max()
-min_score = student_data['score'].min()
-total_activities = student_data['activity'].count()
+with span("overall stats"), feed_lock:
+    overall_stats = student_index.overall_stats(selected_student_id)
+    mean_score = overall_stats['mean_score']
+    max_score = overall_stats['max_score']
+    min_score = overall_stats['min_score']
+    total_activities = overall_stats['total_activities']
 
-# Passing percentage and pass/fail status
-passing_percentage = 60
-status = "Passed" if mean_score >= passing_percentage else "Failed"
+    # Passing percentage and pass/fail status
+    passing_percentage = 60
+    status = "Passed" if mean_score >= passing_percentage else "Failed"
+    class_rank = class_ranking.rank(selected_student_id)
 
 st.markdown(f"""
     <div style="background-color: #e9ecef; padding: 20px; border-radius: 10px; text-align: center;">
@@ -127,26 +189,72 @@ st.markdown(f"""
         <p style="font-size: 18px; color: #dc3545;"><strong>Maximum Score:</strong> {max_score}</p>
         <p style="font-size: 18px; color: #ffc107;"><strong>Minimum Score:</strong> {min_score}</p>
         <p style="font-size: 18px; color: #007bff;"><strong>Total Activities:</strong> {total_activities}</p>
+        <p style="font-size: 18px; color: #6f42c1;"><strong>Class Rank:</strong> {class_rank} of {len(class_ranking)}</p>
         <p style="font-size: 18px; color: #ff5733;"><strong>Status:</strong> {status}</p>
     </div>
 """, unsafe_allow_html=True)
 
+# Display progress trends per subject
+st.subheader("Progress Trends")
+
+with span("trends"):
+    with feed_lock:
+        trends = trend_tracker.student_trends(selected_student_id)
+    st.dataframe(
+        trends,
+        column_config={
+            "rolling_7d": st.column_config.NumberColumn("7-day average", format="%.1f"),
+            "rolling_30d": st.column_config.NumberColumn("30-day average", format="%.1f"),
+            "slope_per_week": st.column_config.NumberColumn("Improvement per week", format="%+.2f"),
+            "wow_delta": st.column_config.NumberColumn("Week-over-week change", format="%+.1f"),
+        },
+        hide_index=True,
+    )
+    if not student_data.empty:
+        rolling = rolling_means(student_data)
+        st.caption("7-day rolling average by subject")
+        st.line_chart(rolling.pivot_table(index='timestamp', columns='subject', values='rolling_7d'))
+
+# Display the student's standing in each subject
+st.subheader("Subject Standing")
+
+with span("subject standing"):
+    with feed_lock:
+        subject_standings = leaderboard.standings(selected_student_id)
+    st.dataframe(
+        subject_standings,
+        column_config={
+            "average_score": st.column_config.NumberColumn("Average", format="%.2f"),
+            "rank": st.column_config.NumberColumn("Class Rank"),
+            "students": st.column_config.NumberColumn("Students"),
+            "percentile": st.column_config.ProgressColumn("Percentile", format="%.0f", min_value=0, max_value=100),
+        },
+        hide_index=True,
+        width='stretch',
+    )
+
 # Display individual quiz/test/poll marks
 st.subheader("Individual Activity Marks")
 
-if not student_data.empty:
-    st.dataframe(student_data[['subject', 'activity', 'score', 'timestamp']])
-
-# Calculate class ranking
-class_avg_scores = df.groupby('student_name')['score'].mean().reset_index()
-class_avg_scores.columns = ['student_name', 'average_score']
-class_avg_scores = class_avg_scores.sort_values(by='average_score', ascending=False).reset_index(drop=True)
-class_avg_scores['rank'] = class_avg_scores.index + 1
+with span("activity marks"):
+    if not student_data.empty:
+        st.dataframe(student_data[['subject', 'activity', 'score', 'timestamp']])
+
+# Scores recorded for the selected student, straight from the store
+with st.expander(f"Recorded scores for {selected_student}"):
+    recorded_subject = st.selectbox("Subject", ["All subjects"] + subjects, key="recorded_subject")
+    with span("recorded scores"):
+        recorded = load_recorded_scores(store.versions['activity_scores'], selected_student_id, None if recorded_subject == "All subjects" else recorded_subject)
+    if recorded.empty:
+        st.caption("No scores recorded yet.")
+    else:
+        st.dataframe(recorded[['subject', 'activity', 'score', 'timestamp']], hide_index=True)
 
 # Display topper
 st.subheader("Topper")
 
-topper = class_avg_scores.iloc[0]
+with span("topper"), feed_lock:
+    topper = class_ranking.topper()
 
 st.markdown(f"""
     <div style="background-color: #e9ecef; padding: 15px; border-radius: 10px; text-align: center;">
@@ -156,91 +264,55 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-# Function to generate PDF report card
-def generate_pdf(df, selected_student):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
-    elements = []
-
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = styles['Title']
-    normal_style = styles['Normal']
-
-    # Title
-    title = Paragraph(f"Comprehensive Report Card for {selected_student}", title_style)
-    elements.append(title)
-    elements.append(Paragraph("<br/>", normal_style))
-
-    # Overall Statistics Table
-    student_data = df[df['student_name'] == selected_student]
-    mean_score = student_data['score'].mean()
-    max_score = student_data['score'].max()
-    min_score = student_data['score'].min()
-    total_activities = student_data['activity'].count()
-
-    stats_data = [
-        ["Metric", "Value"],
-        ["Average Score", f"{mean_score:.2f}"],
-        ["Maximum Score", str(max_score)],
-        ["Minimum Score", str(min_score)],
-        ["Total Activities", str(total_activities)]
-    ]
-    
-    stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(stats_table)
-    elements.append(Paragraph("<br/>", normal_style))  # Added space
-
-    # Individual Activity Marks Table
-    activity_data = [["Subject", "Activity", "Score", "Date"]]
-    for _, row in student_data.iterrows():
-        activity_data.append([
-            row['subject'],
-            row['activity'].capitalize(),
-            str(row['score']),
-            row['timestamp'].strftime('%Y-%m-%d')
-        ])
-    
-    activity_table = Table(activity_data, colWidths=[1.5*inch, 1.5*inch, 1*inch, 1.5*inch])
-    activity_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(activity_table)
-    elements.append(Paragraph("<br/>", normal_style))  # Added space
-
-    # Highest Marks Achieved by the Selected Student
-    highest_marks = student_data['score'].max()
-    
-    comment = ""
-    if mean_score >= 80:
-        comment = "Excellent work! Keep up the great performance."
-    elif mean_score >= 60:
-        comment = "Good job! There is room for improvement."
-    else:
-        comment = "Needs improvement. Consider revising the material more thoroughly."
-    
-    elements.append(Paragraph(f"Highest Marks Achieved by {selected_student}: {highest_marks}", normal_style))
-    elements.append(Paragraph("<br/>", normal_style))  # Added space
-    elements.append(Paragraph(f"Comments: {comment}", normal_style))
-    elements.append(Paragraph("<br/>", normal_style))  # Added space
-
-    # Build the PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
+# Display top students per subject or activity
+st.subheader("Leaderboards")
+
+dimension_col, group_col = st.columns(2)
+dimension = dimension_col.radio("Leaderboard by", DIMENSIONS, format_func=str.capitalize, horizontal=True)
+with feed_lock:
+    group = group_col.selectbox(dimension.capitalize(), leaderboard.groups(dimension))
+with span("leaderboard"):
+    with feed_lock:
+        top_students = leaderboard.top_k(dimension, group, 10)
+    st.dataframe(
+        top_students,
+        column_config={
+            "student_id": None,
+            "student_name": st.column_config.TextColumn("Student"),
+            "average_score": st.column_config.NumberColumn("Average Score", format="%.2f"),
+        },
+        hide_index=True,
+        width='stretch',
+    )
 
 # Button to download the PDF
 if st.button("Download Comprehensive Report Card as PDF"):
-    pdf_buffer = generate_pdf(df, selected_student)
+    with span("report card pdf"):
+        with feed_lock:
+            class_highest = leaderboard.highest_score()
+        pdf_buffer = report_cards.generate_pdf(student_data, selected_student, class_highest=class_highest, standings=subject_standings)
     st.download_button(label="Download PDF", data=pdf_buffer, file_name=f"{selected_student}_Comprehensive_Report_Card.pdf", mime="application/pdf")
+
+# Generate report cards for every student on a process pool
+st.subheader("Report Cards for the Whole Class")
+st.caption("Each student's report card is a separate PDF; they are downloaded together as one ZIP archive.")
+
+if st.button("Generate Report Cards for All Students"):
+    progress_bar = st.progress(0.0, text="Rendering report cards...")
+    zip_path = os.path.join(tempfile.gettempdir(), f"class_report_cards_{data_version}.zip")
+    with span("class report cards"):
+        report_cards.generate_class_reports(
+            student_index,
+            zip_path,
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"Rendered {done} of {total} report cards"),
+            leaderboard=leaderboard,
+            lock=feed_lock,
+        )
+    st.session_state.class_reports_path = zip_path
+
+class_reports_path = st.session_state.get('class_reports_path')
+if class_reports_path and os.path.exists(class_reports_path):
+    with open(class_reports_path, 'rb') as zip_file:
+        st.download_button(label="Download All Report Cards (ZIP)", data=zip_file, file_name="Class_Report_Cards.zip", mime="application/zip")
+
+profile_panel()
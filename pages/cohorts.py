@@ -0,0 +1,36 @@
+import os
+import time
+
+import streamlit as st
+
+from cohort_cube import DIMENSIONS, MEASURES, CohortCube
+from student_dataset import DATASET_PATH, load_student_dataset
+
+# Cohort cube over student-dataset.csv, rebuilt only when the file changes
+@st.cache_resource(max_entries=1)
+def load_cohort_cube(mtime_ns):
+    return CohortCube.from_frame(load_student_dataset())
+
+# Streamlit UI
+st.set_page_config(page_title="Cohort Explorer", layout="wide")
+
+st.title("Cohort Explorer 🧭")
+
+cube = load_cohort_cube(os.stat(DATASET_PATH).st_mtime_ns)
+
+# Filters narrow the cells, "Group by" drills down one dimension at a time
+st.sidebar.header("Filters")
+filters = {
+    dimension: st.sidebar.multiselect(dimension, cube.dimension_values(dimension))
+    for dimension in DIMENSIONS
+}
+group_by = st.multiselect("Group by", DIMENSIONS, default=['nationality'])
+measures = st.multiselect("Grades", MEASURES, default=MEASURES)
+
+start = time.perf_counter()
+result = cube.rollup(by=group_by, filters=filters)
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+columns = ['students'] + [f'{measure} {stat}' for measure in measures for stat in ('mean', 'std')]
+st.dataframe(result[columns].round(2), width='stretch')
+st.caption(f"{len(result)} groups from {len(cube.cells)} cohort cells in {elapsed_ms:.1f} ms")
@@ -1,18 +1,54 @@
+import functools
+
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.platypus import Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet
+
+from lazy_imports import lazy_import
+from paging import page_count, page_slice
+from poll_tally import PollTally, results_frame
+from profiler import page_profiler, profile_panel, profiled, span
+from question_bank import (
+    parse_questions_bytes,
+    question_key,
+    questions_markdown,
+    search_questions,
+    upload_digest,
+)
+from storage import get_store
+from upload_store import UploadStore
+
+# The PDF stack is only loaded when a report card is requested
+report_cards = lazy_import('report_cards')
+
+# Number of questions rendered as widgets at a time
+QUESTIONS_PER_PAGE = 10
 
 # Initialize session state if not already done
 if 'questions' not in st.session_state:
     st.session_state.questions = []
 if 'polling' not in st.session_state:
     st.session_state.polling = []
+if 'question_keys' not in st.session_state:
+    st.session_state.question_keys = set()
+if 'loaded_uploads' not in st.session_state:
+    st.session_state.loaded_uploads = set()
+if 'question_page' not in st.session_state:
+    st.session_state.question_page = 1
+if 'classroom_upload_generation' not in st.session_state:
+    st.session_state.classroom_upload_generation = 0
+
+# Answer counts shared by every session connected to this server
+@st.cache_resource
+def get_poll_tally():
+    return PollTally()
+
+# Classroom files on disk, shared by every session connected to this server
+@st.cache_resource
+def get_upload_store():
+    return UploadStore()
+
+poll_tally = get_poll_tally()
+store = get_store()
+upload_store = get_upload_store()
 
 # Function to provide feedback with visual enhancements
 def provide_feedback(correct_answer, student_answer):
@@ -26,112 +62,54 @@ def provide_feedback(correct_answer, student_answer):
         icon = "❌"        # Cross mark emoji
     return feedback, color, icon
 
-# Function to add a question
+# Function to add a question, skipping ones already in the bank with the same text and options
 def add_question(question, options, correct_answer):
+    key = question_key(question, options)
+    if key in st.session_state.question_keys:
+        return False
+    st.session_state.question_keys.add(key)
     st.session_state.questions.append({
         "question": question,
         "options": options,
         "correct_answer": correct_answer
     })
+    return True
 
-# Function to load questions from a CSV file
+# Function to load questions from a CSV file; each distinct upload is imported once
+@profiled("question import")
 def load_questions_from_csv(file):
-    df = pd.read_csv(file)
-    for _, row in df.iterrows():
-        question = row['question']
-        options = [row[f'option{i}'] for i in range(1, 5) if pd.notna(row[f'option{i}'])]
-        correct_answer = row['correct_answer']
-        add_question(question, options, correct_answer)
-    st.sidebar.success("Questions loaded successfully from CSV!")
-
-# Function to generate PDF report card
-def generate_pdf(student_data, selected_student, selected_subject, mean_score, max_score, min_score, total_activities, status):
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    
-    # Title
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(1*inch, height - 1*inch, f"Report Card for {selected_student}")
-    
-    # Subject
-    c.setFont("Helvetica", 12)
-    c.drawString(1*inch, height - 1.5*inch, f"Subject: {selected_subject}")
-    
-    # Overall Statistics Table
-    data = [
-        ["Metric", "Value"],
-        ["Average Score", f"{mean_score:.2f}"],
-        ["Maximum Score", str(max_score)],
-        ["Minimum Score", str(min_score)],
-        ["Total Activities", str(total_activities)],
-        ["Status", status]
-    ]
-    
-    table = Table(data, colWidths=[3*inch, 2*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    table.wrapOn(c, width, height)
-    table.drawOn(c, 1*inch, height - 2.2*inch)
-
-    # Individual Activity Marks Table
-    activity_data = [["Activity", "Score", "Date", "Subject"]]
-    for _, row in student_data.iterrows():
-        activity_data.append([
-            row['activity'].capitalize(),
-            str(row['score']),
-            row['timestamp'].strftime('%Y-%m-%d'),
-            row['subject']
-        ])
-    
-    activity_table = Table(activity_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 1.5*inch])
-    activity_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    activity_table.wrapOn(c, width, height)
-    activity_table.drawOn(c, 1*inch, height - 4*inch)
-    
-    # Highest Marks Achieved by Any Student in the Class
-    highest_marks_in_class = student_data['score'].max()
-    
-    # Comment Section
-    styles = getSampleStyleSheet()
-    comment = ""
-    
-    if mean_score >= 80:
-        comment = "Excellent work! Keep up the great performance."
-    elif mean_score >= 60:
-        comment = "Good job! There is room for improvement."
-    else:
-        comment = "Needs improvement. Consider revising the material more thoroughly."
-    
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(1*inch, height - 6.5*inch, f"Highest Marks Achieved by Any Student in the Class: {highest_marks_in_class}")
-    
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(1*inch, height - 7*inch, "Comments:")
-    
-    c.setFont("Helvetica", 12)
-    c.drawString(1*inch, height - 7.5*inch, comment)
-    
-    # Save PDF
-    c.save()
-    buffer.seek(0)
-    return buffer
+    data = file.getvalue()
+    digest = upload_digest(data)
+    if digest in st.session_state.loaded_uploads:
+        return
+    added = 0
+    for q in parse_questions_bytes(data):
+        added += add_question(q['question'], q['options'], q['correct_answer'])
+    st.session_state.loaded_uploads.add(digest)
+    st.sidebar.success(f"Loaded {added} new questions from CSV!")
+
+# Function to generate PDF report card; `class_highest` is the class-wide highest mark, e.g. from
+# Leaderboard.highest_score(), and the line is left out when it is not given
+def generate_pdf(student_data, selected_student, selected_subject, mean_score, max_score, min_score, total_activities, status, class_highest=None):
+    stats = {
+        'mean_score': mean_score,
+        'max_score': max_score,
+        'min_score': min_score,
+        'total_activities': total_activities,
+    }
+    return report_cards.render_report_card(
+        student_data,
+        selected_student,
+        title=f"Report Card for {selected_student}",
+        subject=selected_subject,
+        stats=stats,
+        status=status,
+        class_highest=class_highest,
+    )
 
 # Streamlit UI
 st.set_page_config(page_title="Classroom Polling System", layout="centered")
+page_profiler("new2")
 
 # Title
 st.title('Classroom Polling System 📊')
@@ -157,50 +135,136 @@ correct_answer = st.sidebar.selectbox("Correct Answer", [option1, option2, optio
 
 if st.sidebar.button("Add Question"):
     if question_text and any([option1, option2, option3, option4]):
-        add_question(question_text, [option1, option2, option3, option4], correct_answer)
-        st.sidebar.success("Question added successfully!")
+        if add_question(question_text, [option1, option2, option3, option4], correct_answer):
+            st.sidebar.success("Question added successfully!")
+        else:
+            st.sidebar.warning("This question is already in the bank.")
     else:
         st.sidebar.error("Please fill out all fields.")
 
 # File upload section
 st.sidebar.header("Upload Files for the Classroom")
 
-uploaded_file = st.sidebar.file_uploader("Upload a file (image, document, etc.)", type=["png", "jpg", "jpeg", "pdf", "docx", "xlsx"])
+# Uploads are spooled to the store once and the uploader is reset, so the file isn't kept in session memory
+uploaded_file = st.sidebar.file_uploader(
+    "Upload a file (image, document, etc.)",
+    type=["png", "jpg", "jpeg", "pdf", "docx", "xlsx"],
+    key=f"classroom_upload_{st.session_state.classroom_upload_generation}",
+)
 
 if uploaded_file is not None:
-    if uploaded_file.type.startswith("image"):
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Image", use_column_width=True)
-    elif uploaded_file.type == "application/pdf":
+    with span("upload spool"):
+        st.session_state.last_classroom_upload = upload_store.save(uploaded_file, uploaded_file.name, uploaded_file.type).digest
+    st.session_state.classroom_upload_generation += 1
+    st.rerun()
+
+# Preview from the cached thumbnail; downloads read the stored file only when clicked
+def show_latest_upload(stored):
+    if stored.mime.startswith("image"):
+        preview = upload_store.thumbnail(stored.digest)
+        if preview is not None:
+            st.image(preview, caption="Uploaded Image")
+        else:
+            st.caption(f"No preview available: '{stored.name}' could not be read as an image.")
+    elif stored.mime == "application/pdf":
         st.write("PDF file uploaded, but cannot be displayed directly.")
-        st.download_button(label="Download PDF", data=uploaded_file, file_name=uploaded_file.name, mime="application/pdf")
     else:
-        st.write(f"File '{uploaded_file.name}' uploaded successfully!")
+        st.write(f"File '{stored.name}' uploaded successfully!")
+    st.download_button(
+        label=f"Download {stored.name}",
+        data=functools.partial(upload_store.open, stored.digest),
+        file_name=stored.name,
+        mime=stored.mime,
+        key=f"download_latest_{stored.digest}",
+    )
+
+last_upload = upload_store.get(st.session_state.get('last_classroom_upload', ''))
+if last_upload is not None:
+    with span("upload preview"):
+        show_latest_upload(last_upload)
+
+classroom_files = upload_store.files()
+if classroom_files:
+    with st.sidebar.expander(f"Classroom Files ({len(classroom_files)})", expanded=False):
+        for stored in classroom_files:
+            st.write(f"{stored.name} ({stored.size / 1024:.0f} KB)")
+            st.download_button(
+                label="Download",
+                data=functools.partial(upload_store.open, stored.digest),
+                file_name=stored.name,
+                mime=stored.mime,
+                key=f"download_{stored.digest}",
+            )
+
+# Start from the first page whenever the search changes
+def reset_question_page():
+    st.session_state.question_page = 1
+
+# Clear the search and open the page holding the requested question
+def jump_to_question():
+    st.session_state.question_search = ""
+    st.session_state.question_page = (st.session_state.jump_to_question - 1) // QUESTIONS_PER_PAGE + 1
 
 # Polling System
 if st.session_state.questions:
     st.header("Current Questions")
+    questions = st.session_state.questions
+
+    # Search and jump-to controls; only the questions on the current page get widgets
+    search_col, jump_col = st.columns([3, 1])
+    search = search_col.text_input("Search questions", key="question_search", on_change=reset_question_page)
+    jump_col.number_input("Jump to question", min_value=1, max_value=len(questions), step=1, key="jump_to_question", on_change=jump_to_question)
+
+    with span("question search"):
+        matches = search_questions(questions, search)
+        pages = page_count(len(matches), QUESTIONS_PER_PAGE)
+    st.session_state.question_page = min(st.session_state.question_page, pages)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="question_page")
+    st.caption(f"Showing {len(page_slice(matches, page, QUESTIONS_PER_PAGE))} of {len(matches)} matching questions")
 
     # Display questions and polling options
-    for i, q in enumerate(st.session_state.questions):
-        st.subheader(f"Q{i + 1}: {q['question']}")
-        selected_option = st.radio("Choose an option:", q['options'], key=f"q{i}")
+    with span("question widgets"):
+        for i in page_slice(matches, page, QUESTIONS_PER_PAGE):
+            q = questions[i]
+            st.subheader(f"Q{i + 1}: {q['question']}")
+            selected_option = st.radio("Choose an option:", q['options'], key=f"q{i}")
 
-        if st.button(f"Submit Answer for Q{i + 1}"):
-            feedback, color, icon = provide_feedback(q['correct_answer'], selected_option)
+            if st.button(f"Submit Answer for Q{i + 1}"):
+                feedback, color, icon = provide_feedback(q['correct_answer'], selected_option)
+                key = question_key(q['question'], q['options'])
+                is_correct = selected_option == q['correct_answer']
+                poll_tally.record(key, q['question'], selected_option, is_correct)
+                store.add_poll_response(key, q['question'], selected_option, is_correct)
             
-            # Display feedback with color and icon
-            st.markdown(f"""
-                <div style="background-color: {color}; padding: 10px; border-radius: 5px; text-align: center;">
-                    <h3 style="margin: 0;">{icon} {feedback}</h3>
-                </div>
-            """, unsafe_allow_html=True)
-
-# Display all the added questions and options
+                # Display feedback with color and icon
+                st.markdown(f"""
+                    <div style="background-color: {color}; padding: 10px; border-radius: 5px; text-align: center;">
+                        <h3 style="margin: 0;">{icon} {feedback}</h3>
+                    </div>
+                """, unsafe_allow_html=True)
+
+# Live results across all sessions, read from a lock-free snapshot of the tally store
+if st.sidebar.checkbox("Show live results"):
+    st.header("Live Results")
+    with span("live results"):
+        results = results_frame(poll_tally.snapshot())
+    if results.empty:
+        st.write("No answers submitted yet.")
+    else:
+        st.dataframe(
+            results,
+            column_config={"percent_correct": st.column_config.ProgressColumn("Correct", format="%.0f%%", min_value=0, max_value=100)},
+            hide_index=True,
+        )
+
+# Display all the added questions and options as a single collapsed block.
+# The bank only grows, so the listing is rebuilt only when the question count changes.
 if st.session_state.questions:
-    st.sidebar.subheader("All Questions")
-    for i, q in enumerate(st.session_state.questions):
-        st.sidebar.write(f"Q{i + 1}: {q['question']}")
-        for opt in q['options']:
-            st.sidebar.write(f" - {opt}")
-        st.sidebar.write(f"Correct Answer: {q['correct_answer']}")
+    if st.session_state.get('questions_markdown_count') != len(st.session_state.questions):
+        with span("question listing"):
+            st.session_state.questions_markdown = questions_markdown(st.session_state.questions)
+        st.session_state.questions_markdown_count = len(st.session_state.questions)
+    with st.sidebar.expander("All Questions", expanded=False):
+        st.markdown(st.session_state.questions_markdown)
+
+profile_panel()
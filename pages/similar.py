@@ -0,0 +1,46 @@
+import os
+
+import streamlit as st
+
+from similar_students import FEATURE_COLUMNS, SimilarityIndex, peer_recommendations
+from student_dataset import DATASET_PATH, load_student_dataset
+
+# Dataset and its similarity index, rebuilt only when the file changes
+@st.cache_resource(max_entries=1)
+def load_similarity_index(mtime_ns):
+    dataset = load_student_dataset()
+    return dataset, SimilarityIndex(dataset)
+
+# Peer-driven recommendations for the whole roster, from one blocked all-pairs pass
+@st.cache_data(max_entries=4)
+def load_peer_recommendations(mtime_ns, k):
+    dataset, index = load_similarity_index(mtime_ns)
+    return peer_recommendations(dataset, index, k)
+
+# Streamlit UI
+st.set_page_config(page_title="Similar Students", layout="wide")
+
+st.title("Similar Students 🤝")
+
+mtime_ns = os.stat(DATASET_PATH).st_mtime_ns
+dataset, index = load_similarity_index(mtime_ns)
+
+positions = range(len(dataset))
+selected = st.sidebar.selectbox("Select Student", positions, format_func=lambda i: f"{dataset['name'].iat[i]} (#{dataset['id'].iat[i]})")
+k = st.sidebar.slider("Number of peers", min_value=1, max_value=20, value=5)
+
+# Nearest peers across grades and ratings
+st.subheader(f"Students most similar to {dataset['name'].iat[selected]}")
+neighbour_indices, distances = index.neighbours([selected], k)
+peers = dataset.iloc[neighbour_indices[0]][['name', 'nationality', *FEATURE_COLUMNS]].copy()
+peers.insert(1, 'distance', distances[0].round(3))
+st.dataframe(peers, hide_index=True, width='stretch')
+
+# Recommendation for the selected student based on their peers
+recommendations = load_peer_recommendations(mtime_ns, k)
+row = recommendations.iloc[selected]
+st.subheader("🔍 Peer-Based Recommendation")
+st.write(f"**Weakest subject relative to peers:** {row['Struggles_with']} ({row['Score']:.1f} / 100)  \n**Recommendation:** {row['Recommendation']}")
+
+with st.expander("Peer-based recommendations for the whole roster"):
+    st.dataframe(recommendations, hide_index=True, width='stretch')
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import streamlit as st
+
+from geo_index import GeoGridIndex, city_centre
+from student_dataset import DATASET_PATH, GRADE_COLUMNS, load_student_dataset
+
+# Dataset and its spatial index, rebuilt only when the file changes
+@st.cache_resource(max_entries=1)
+def load_geo_index(mtime_ns):
+    dataset = load_student_dataset()
+    return dataset, GeoGridIndex(dataset['latitude'], dataset['longitude'])
+
+# Streamlit UI
+st.set_page_config(page_title="Student Map", layout="wide")
+
+st.title("Student Map 🗺️")
+
+dataset, geo_index = load_geo_index(os.stat(DATASET_PATH).st_mtime_ns)
+
+# Students near a city
+st.sidebar.header("Students Near a City")
+cities = sorted(dataset['city'].dropna().unique())
+city = st.sidebar.selectbox("City", cities, index=cities.index("Oakland") if "Oakland" in cities else 0)
+radius_km = st.sidebar.slider("Radius (km)", min_value=5, max_value=500, value=50, step=5)
+
+centre = city_centre(dataset, city)
+positions, distances = geo_index.radius(*centre, radius_km)
+nearby = dataset.iloc[positions][['name', 'city', *GRADE_COLUMNS]].copy()
+nearby.insert(2, 'distance_km', np.round(distances, 1))
+
+st.subheader(f"{len(nearby)} students within {radius_km} km of {city}")
+if not nearby.empty:
+    averages = nearby[GRADE_COLUMNS].mean()
+    for column, metric in zip(st.columns(len(GRADE_COLUMNS)), GRADE_COLUMNS):
+        column.metric(f"Average {metric}", f"{averages[metric]:.2f}")
+    st.dataframe(nearby, hide_index=True, width='stretch')
+
+# Map of clustered locations; clustering happens on the server per zoom level
+st.subheader("Where Students Live")
+zoom = st.slider("Map detail (zoom level)", min_value=1, max_value=10, value=2)
+clusters = geo_index.clusters(zoom, dataset[GRADE_COLUMNS])
+clusters = clusters.assign(size=np.sqrt(clusters['students']) * 20000 / 2 ** (zoom - 1))
+st.map(clusters, latitude='latitude', longitude='longitude', size='size', zoom=zoom)
+st.caption(f"{len(clusters)} clusters for {len(geo_index)} students")
+st.dataframe(clusters.drop(columns='size').round(2), hide_index=True, width='stretch')
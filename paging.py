@@ -0,0 +1,14 @@
+def page_count(total, per_page):
+    return max(1, -(-total // per_page))
+
+
+# Positions shown on a 1-based page
+def page_slice(positions, page, per_page):
+    start = (page - 1) * per_page
+    return positions[start:start + per_page]
+
+
+# Rows of a frame shown on a 1-based page, so only that window is sent to the browser
+def frame_page(frame, page, per_page):
+    start = (page - 1) * per_page
+    return frame.iloc[start:start + per_page]
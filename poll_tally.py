@@ -0,0 +1,64 @@
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+# Per-question results; entries are never mutated, a submission replaces the whole entry
+QuestionTally = namedtuple('QuestionTally', ['question', 'option_counts', 'correct', 'total'])
+
+
+class _Stripe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tallies = {}
+
+
+# Live answer counts shared by every session in the process.
+# Questions are spread over lock stripes so concurrent submissions to different questions
+# rarely contend. Writers publish a fresh immutable entry per submission, so readers take no
+# locks at all: copying a stripe's dict is atomic under the GIL and every entry they see is
+# internally consistent.
+class PollTally:
+    def __init__(self, stripes=32):
+        self._stripes = [_Stripe() for _ in range(stripes)]
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def record(self, key, question, option, correct):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            tally = stripe.tallies.get(key)
+            if tally is None:
+                tally = QuestionTally(question, {}, 0, 0)
+            option_counts = dict(tally.option_counts)
+            option_counts[option] = option_counts.get(option, 0) + 1
+            stripe.tallies[key] = QuestionTally(question, option_counts, tally.correct + bool(correct), tally.total + 1)
+
+    def get(self, key):
+        return self._stripe(key).tallies.get(key)
+
+    def snapshot(self):
+        merged = {}
+        for stripe in self._stripes:
+            merged.update(stripe.tallies.copy())
+        return merged
+
+    def reset(self):
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.tallies = {}
+
+
+# One row per question with its response count, percentage correct and option counts
+def results_frame(snapshot):
+    rows = [
+        {
+            'question': tally.question,
+            'responses': tally.total,
+            'percent_correct': 100.0 * tally.correct / tally.total if tally.total else 0.0,
+            'option_counts': ", ".join(f"{option}: {count}" for option, count in tally.option_counts.items()),
+        }
+        for tally in snapshot.values()
+    ]
+    return pd.DataFrame(rows, columns=['question', 'responses', 'percent_correct', 'option_counts'])
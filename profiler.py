@@ -0,0 +1,277 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+import pandas as pd
+
+PROFILE_LOG = os.environ.get('PROFILE_LOG', 'profile.jsonl')
+PROFILE_LOG_MAX_BYTES = 5 * 1024 * 1024
+PROFILE_LOG_BACKUPS = 3
+
+# Recent runs kept in memory for the rollups shown on the pages
+HISTORY_SIZE = 500
+
+# The run being profiled in the current script thread, or None when profiling is off
+_current_run = contextvars.ContextVar('profile_run', default=None)
+_history = deque(maxlen=HISTORY_SIZE)
+_log_lock = threading.Lock()
+_loggers = {}
+
+# tracemalloc is process-wide, so it is shared by every run that traces allocations: started by
+# the first and stopped when the last one finishes (unless something else had already started it)
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_runs, _tracing_owned
+    with _tracing_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_runs += 1
+
+
+def _release_tracing():
+    global _tracing_runs, _tracing_owned
+    with _tracing_lock:
+        _tracing_runs -= 1
+        if _tracing_runs == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+# Shared do-nothing span handed out when no run is active, so disabled spans cost one lookup
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+# Spans are listed in the order they were opened, so nested spans follow their parent.
+# alloc_bytes is the change in traced memory for the whole process while the span was open,
+# so it includes anything other sessions allocated at the same time.
+class _Span:
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.entry = {'span': ' > '.join(self.run.stack + [self.name]), 'depth': len(self.run.stack), 'seconds': None, 'alloc_bytes': None}
+        self.run.spans.append(self.entry)
+        self.run.stack.append(self.name)
+        self.allocated = tracemalloc.get_traced_memory()[0] if self.run.trace_memory else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.entry['seconds'] = time.perf_counter() - self.start
+        if self.allocated is not None:
+            self.entry['alloc_bytes'] = tracemalloc.get_traced_memory()[0] - self.allocated
+        self.run.stack.pop()
+        return False
+
+
+# Timings for one rerun of one page
+class ProfileRun:
+    def __init__(self, page, trace_memory=False):
+        self.page = page
+        self.trace_memory = trace_memory
+        self.spans = []
+        self.stack = []
+        # The share of allocation tracing is also given back if the run is garbage collected
+        # without being closed, e.g. with the session of a disconnected client
+        self._release = None
+        if trace_memory:
+            _acquire_tracing()
+            self._release = weakref.finalize(self, _release_tracing)
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    # Give up this run's share of allocation tracing; safe to call more than once
+    def close(self):
+        if self._release is not None:
+            self._release()
+
+    def frame(self):
+        return pd.DataFrame(self.spans, columns=['span', 'depth', 'seconds', 'alloc_bytes'])
+
+    def record(self):
+        return {'page': self.page, 'time': time.time(), 'seconds': self.seconds, 'spans': self.spans}
+
+
+# Drop the unfinished run in this thread's context, if any. Streamlit runs each rerun in a fresh
+# context, so a run left open by an earlier rerun is closed through session state instead.
+def discard_run():
+    run = _current_run.get()
+    if run is not None:
+        run.close()
+    _current_run.set(None)
+
+
+# Begin profiling a rerun in this script thread; spans opened until `finish_run` are recorded
+def start_run(page, trace_memory=False):
+    discard_run()
+    run = ProfileRun(page, trace_memory)
+    _current_run.set(run)
+    return run
+
+
+# End the current run, append it to the history and the JSONL log, and return it
+def finish_run(log_path=PROFILE_LOG):
+    run = _current_run.get()
+    if run is None:
+        return None
+    _current_run.set(None)
+    run.seconds = time.perf_counter() - run.start
+    run.close()
+    record = run.record()
+    _history.append(record)
+    if log_path:
+        _log_writer(log_path).info(json.dumps(record))
+    return run
+
+
+# A named timing span: `with span("charts"): ...`
+def span(name):
+    run = _current_run.get()
+    return NULL_SPAN if run is None else _Span(run, name)
+
+
+# Decorator recording every call of a function as a span
+def profiled(name=None):
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = _current_run.get()
+            if run is None:
+                return func(*args, **kwargs)
+            with _Span(run, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# One JSON record per line, rotated by size
+def _log_writer(log_path):
+    with _log_lock:
+        logger = _loggers.get(log_path)
+        if logger is None:
+            logger = logging.getLogger(f'{__name__}.{len(_loggers)}')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(log_path, maxBytes=PROFILE_LOG_MAX_BYTES, backupCount=PROFILE_LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            _loggers[log_path] = logger
+        return logger
+
+
+def history(page=None):
+    return [record for record in list(_history) if page is None or record['page'] == page]
+
+
+# Runs from the log and its rotated backups, oldest first
+def read_log(log_path=PROFILE_LOG):
+    paths = [f'{log_path}.{i}' for i in range(PROFILE_LOG_BACKUPS, 0, -1)] + [log_path]
+    records = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+# p50/p95 seconds per page and span over a list of run records, with the whole rerun as span "(total)"
+def rollup(records):
+    rows = []
+    for record in records:
+        rows.append((record['page'], '(total)', record['seconds'], None))
+        rows.extend((record['page'], entry['span'], entry['seconds'], entry['alloc_bytes']) for entry in record['spans'])
+    columns = ['page', 'span', 'runs', 'p50_seconds', 'p95_seconds', 'p50_alloc_bytes']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame(rows, columns=['page', 'span', 'seconds', 'alloc_bytes']).astype({'seconds': float, 'alloc_bytes': float})
+    grouped = frame.groupby(['page', 'span'], sort=False)
+    return pd.DataFrame({
+        'runs': grouped['seconds'].count(),
+        'p50_seconds': grouped['seconds'].quantile(0.5),
+        'p95_seconds': grouped['seconds'].quantile(0.95),
+        'p50_alloc_bytes': grouped['alloc_bytes'].quantile(0.5),
+    }).reset_index()[columns]
+
+
+# Sidebar switch for profiling this page's reruns; starts a run when it is on
+def page_profiler(page):
+    import streamlit as st
+
+    # The session's previous run is still open if that rerun ended early (an exception, st.stop
+    # or a new rerun interrupting it), and would otherwise keep its share of allocation tracing
+    previous = st.session_state.pop(f"_profile_run_{page}", None)
+    if previous is not None:
+        previous.close()
+
+    with st.sidebar.expander("⏱️ Profiler"):
+        enabled = st.toggle("Profile reruns", key=f"profile_{page}")
+        trace_memory = st.checkbox("Trace allocations", key=f"profile_memory_{page}", disabled=not enabled)
+    if not enabled:
+        discard_run()
+        return None
+    run = st.session_state[f"_profile_run_{page}"] = start_run(page, trace_memory)
+    return run
+
+
+# Finish the current run and show its breakdown and the page's rollups in the sidebar
+def profile_panel():
+    run = finish_run()
+    if run is None:
+        return
+    import streamlit as st
+
+    st.session_state.pop(f"_profile_run_{run.page}", None)
+
+    with st.sidebar.expander(f"⏱️ This rerun: {run.seconds * 1000:.0f} ms", expanded=True):
+        breakdown = run.frame()
+        breakdown['span'] = [' ' * 2 * depth + name.rsplit(' > ', 1)[-1] for name, depth in zip(breakdown['span'], breakdown['depth'])]
+        breakdown['ms'] = np.round(breakdown['seconds'] * 1000, 1)
+        columns = ['span', 'ms'] + (['alloc_bytes'] if run.trace_memory else [])
+        st.dataframe(
+            breakdown[columns],
+            column_config={"alloc_bytes": st.column_config.NumberColumn("Process alloc (bytes)", help="Traced memory change for the whole process, including other sessions")},
+            hide_index=True,
+            width='stretch',
+        )
+        st.caption(f"p50/p95 over the last {len(history(run.page))} reruns")
+        st.dataframe(
+            rollup(history(run.page)).drop(columns='page'),
+            column_config={"p50_alloc_bytes": st.column_config.NumberColumn("p50 process alloc (bytes)")},
+            hide_index=True,
+            width='stretch',
+        )
+
+
+if __name__ == '__main__':
+    print(rollup(read_log(sys.argv[1] if len(sys.argv) > 1 else PROFILE_LOG)).to_string(index=False))
@@ -0,0 +1,179 @@
+from bisect import insort
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+SHORT_WINDOW = pd.Timedelta(days=7)
+LONG_WINDOW = pd.Timedelta(days=30)
+WEEK_FREQ = 'W-SUN'
+DAY = pd.Timedelta(days=1)
+
+TREND_COLUMNS = ['subject', 'rolling_7d', 'rolling_30d', 'slope_per_week', 'wow_delta', 'activities']
+
+
+# Rolling 7- and 30-day means per subject over time, for charting one student's history
+def rolling_means(student_data):
+    rows = student_data.sort_values('timestamp', kind='stable').set_index('timestamp')
+    grouped = rows.groupby('subject')['score']
+    return pd.DataFrame({
+        'rolling_7d': grouped.rolling(SHORT_WINDOW).mean(),
+        'rolling_30d': grouped.rolling(LONG_WINDOW).mean(),
+    }).reset_index()
+
+
+# Trend figures per (student_id, subject) for a whole frame in one vectorized pass:
+# rolling means over the windows ending at each group's latest activity, least-squares slope
+# of score against time, and the change between the last two calendar weeks' means
+def trend_frame(df):
+    keys = ['student_id', 'subject']
+    rows = df[keys + ['score', 'timestamp']].sort_values(keys + ['timestamp'], kind='stable')
+    grouped = rows.groupby(keys, sort=True)
+    latest = grouped['timestamp'].transform('max')
+    origin = grouped['timestamp'].transform('min')
+
+    x = ((rows['timestamp'] - origin) / DAY).to_numpy(dtype=float)
+    y = rows['score'].to_numpy(dtype=float)
+    sums = pd.DataFrame({'n': 1.0, 'x': x, 'y': y, 'xy': x * y, 'xx': x * x}, index=rows.index)
+    for name, window in (('7d', SHORT_WINDOW), ('30d', LONG_WINDOW)):
+        inside = (rows['timestamp'] > latest - window).to_numpy()
+        sums[f'sum_{name}'] = np.where(inside, y, 0.0)
+        sums[f'n_{name}'] = inside.astype(float)
+
+    week = rows['timestamp'].dt.to_period(WEEK_FREQ)
+    latest_week = latest.dt.to_period(WEEK_FREQ)
+    for name, offset in (('this_week', 0), ('last_week', 1)):
+        inside = (week == latest_week - offset).to_numpy()
+        sums[f'sum_{name}'] = np.where(inside, y, 0.0)
+        sums[f'n_{name}'] = inside.astype(float)
+
+    totals = sums.groupby([rows[key] for key in keys], sort=True).sum()
+    return _trend_figures(totals).reset_index()
+
+
+def _ratio(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator != 0)
+
+
+# Trend figures from accumulated sums; shared by the batch and the incremental paths
+def _trend_figures(totals):
+    n = totals['n']
+    slope_per_day = _ratio(n * totals['xy'] - totals['x'] * totals['y'], n * totals['xx'] - totals['x'] ** 2)
+    return pd.DataFrame({
+        'rolling_7d': _ratio(totals['sum_7d'], totals['n_7d']),
+        'rolling_30d': _ratio(totals['sum_30d'], totals['n_30d']),
+        'slope_per_week': slope_per_day * 7,
+        'wow_delta': _ratio(totals['sum_this_week'], totals['n_this_week']) - _ratio(totals['sum_last_week'], totals['n_last_week']),
+        'activities': n.astype(int),
+    }, index=totals.index)
+
+
+# Running state for one (student, subject) series
+class _Series:
+    def __init__(self, origin):
+        self.origin = origin
+        self.latest = origin
+        self.window = deque()  # (timestamp, score) within LONG_WINDOW of latest, in time order
+        self.n = self.x = self.y = self.xy = self.xx = 0.0
+        self.weeks = {}  # week period -> [sum, count], for the latest two weeks
+
+    def add(self, timestamp, score):
+        x = (timestamp - self.origin) / DAY
+        self.n += 1
+        self.x += x
+        self.y += score
+        self.xy += x * score
+        self.xx += x * x
+
+        if timestamp >= self.latest:
+            self.latest = timestamp
+            self.window.append((timestamp, score))
+        elif timestamp > self.latest - LONG_WINDOW:
+            insort(self.window, (timestamp, score))
+        while self.window and self.window[0][0] <= self.latest - LONG_WINDOW:
+            self.window.popleft()
+
+        week = timestamp.to_period(WEEK_FREQ)
+        latest_week = self.latest.to_period(WEEK_FREQ)
+        if week >= latest_week - 1:
+            bucket = self.weeks.setdefault(week, [0.0, 0])
+            bucket[0] += score
+            bucket[1] += 1
+        for stale in [w for w in self.weeks if w < latest_week - 1]:
+            del self.weeks[stale]
+
+    def totals(self):
+        short_cutoff = self.latest - SHORT_WINDOW
+        short = [score for timestamp, score in self.window if timestamp > short_cutoff]
+        latest_week = self.latest.to_period(WEEK_FREQ)
+        this_week = self.weeks.get(latest_week, [0.0, 0])
+        last_week = self.weeks.get(latest_week - 1, [0.0, 0])
+        return {
+            'n': self.n, 'x': self.x, 'y': self.y, 'xy': self.xy, 'xx': self.xx,
+            'sum_7d': sum(short), 'n_7d': len(short),
+            'sum_30d': sum(score for _, score in self.window), 'n_30d': len(self.window),
+            'sum_this_week': this_week[0], 'n_this_week': this_week[1],
+            'sum_last_week': last_week[0], 'n_last_week': last_week[1],
+        }
+
+
+# Incrementally maintained trends: adding one score updates that series' windows and sums
+# in place instead of recomputing the student's whole history
+class TrendTracker:
+    def __init__(self):
+        self._students = {}  # student_id -> {subject: _Series}
+
+    # Seed every series from a frame: the regression sums and week buckets are computed with
+    # groupby, and only rows inside the long window are loaded into the window deques
+    @classmethod
+    def from_frame(cls, df):
+        tracker = cls()
+        keys = ['student_id', 'subject']
+        rows = df[keys + ['score', 'timestamp']].sort_values(keys + ['timestamp'], kind='stable')
+        grouped = rows.groupby(keys, sort=False)
+        origin = grouped['timestamp'].transform('min')
+        latest = grouped['timestamp'].transform('max')
+
+        x = ((rows['timestamp'] - origin) / DAY).to_numpy(dtype=float)
+        y = rows['score'].to_numpy(dtype=float)
+        sums = pd.DataFrame({'n': 1.0, 'x': x, 'y': y, 'xy': x * y, 'xx': x * x}, index=rows.index)
+        totals = sums.groupby([rows[key] for key in keys], sort=False).sum()
+        bounds = grouped['timestamp'].agg(['min', 'max'])
+
+        for (student_id, subject), origin_ts, latest_ts in zip(bounds.index, bounds['min'], bounds['max']):
+            series = _Series(origin_ts)
+            series.latest = latest_ts
+            tracker._students.setdefault(student_id, {})[subject] = series
+        for (student_id, subject), n, sx, sy, sxy, sxx in zip(totals.index, totals['n'], totals['x'], totals['y'], totals['xy'], totals['xx']):
+            series = tracker._students[student_id][subject]
+            series.n, series.x, series.y, series.xy, series.xx = n, sx, sy, sxy, sxx
+
+        recent = rows[(rows['timestamp'] > latest - LONG_WINDOW).to_numpy()]
+        for student_id, subject, timestamp, score in zip(recent['student_id'], recent['subject'], recent['timestamp'], recent['score'].to_numpy(dtype=float)):
+            tracker._students[student_id][subject].window.append((timestamp, score))
+
+        week = rows['timestamp'].dt.to_period(WEEK_FREQ)
+        in_last_two = (week >= latest.dt.to_period(WEEK_FREQ) - 1).to_numpy()
+        buckets = rows[in_last_two].groupby([rows[key][in_last_two] for key in keys] + [week[in_last_two]], sort=False)['score'].agg(['sum', 'count'])
+        for (student_id, subject, bucket_week), total, count in zip(buckets.index, buckets['sum'], buckets['count']):
+            tracker._students[student_id][subject].weeks[bucket_week] = [float(total), int(count)]
+        return tracker
+
+    def add(self, student_id, subject, score, timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        subjects = self._students.setdefault(student_id, {})
+        series = subjects.get(subject)
+        if series is None:
+            series = subjects[subject] = _Series(timestamp)
+        series.add(timestamp, float(score))
+
+    # Trend figures for every subject of one student
+    def student_trends(self, student_id):
+        subjects = self._students.get(student_id, {})
+        if not subjects:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        names = sorted(subjects)
+        totals = pd.DataFrame([subjects[subject].totals() for subject in names], index=pd.Index(names, name='subject'))
+        return _trend_figures(totals).reset_index()
@@ -0,0 +1,62 @@
+import hashlib
+from io import BytesIO
+
+import pandas as pd
+
+OPTION_COLUMNS = [f'option{i}' for i in range(1, 5)]
+KEY_SEPARATOR = "\x1f"
+
+
+# Content address of an uploaded file, so the same upload is only ever imported once
+def upload_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Identity of a question for de-duplication: its text plus its options, in order
+def question_key(question, options):
+    return KEY_SEPARATOR.join([str(question)] + [str(option) for option in options])
+
+
+# Parse a question-bank CSV in one pass over whole columns.
+# Every cell is read as text, with blank cells as empty strings, so options and answers compare
+# exactly as written (an option "3" stays "3" even when another row leaves that column blank).
+# Returns question dicts in file order, with duplicate (question, options) rows dropped.
+def parse_questions_csv(file):
+    df = pd.read_csv(file, dtype=str, keep_default_na=False).reindex(columns=['question', *OPTION_COLUMNS, 'correct_answer'], fill_value='')
+    df = df[df['question'] != '']
+
+    # The present options of each row, each prefixed by the separator, as one string column;
+    # the question text plus this column is exactly question_key(question, options)
+    joined = pd.Series('', index=df.index)
+    for column in OPTION_COLUMNS:
+        joined = joined + (KEY_SEPARATOR + df[column]).where(df[column] != '', '')
+    unique = ~(df['question'] + joined).duplicated()
+
+    df, joined = df[unique], joined[unique]
+    options = joined.str[1:].str.split(KEY_SEPARATOR).where(joined != '', pd.Series([[]] * len(joined), index=joined.index, dtype=object))
+    return [
+        {"question": question, "options": opts, "correct_answer": correct_answer}
+        for question, opts, correct_answer in zip(df['question'].tolist(), options.tolist(), df['correct_answer'].tolist())
+    ]
+
+
+# Parse raw upload bytes; a thin wrapper so callers can hash and parse the same buffer
+def parse_questions_bytes(data):
+    return parse_questions_csv(BytesIO(data))
+
+
+# Positions of the questions whose text contains `query` (case-insensitive); all positions if empty
+def search_questions(questions, query):
+    query = query.strip().lower()
+    if not query:
+        return range(len(questions))
+    return [i for i, q in enumerate(questions) if query in str(q['question']).lower()]
+
+
+# Markdown listing of the whole bank, rendered as one block instead of one element per line
+def questions_markdown(questions):
+    blocks = []
+    for i, q in enumerate(questions):
+        options = "".join(f"\n- {opt}" for opt in q['options'])
+        blocks.append(f"Q{i + 1}: {q['question']}\n{options}\n\nCorrect Answer: {q['correct_answer']}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,84 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+ADVANCED_RECOMMENDATION = "Provide advanced resources."
+
+# Score thresholds, lowest first: a score below the threshold gets that tier's template
+DEFAULT_RULES = [
+    (50, "Provide basic resources in {}."),
+    (70, "Provide intermediate resources in {}."),
+]
+
+
+# Personalized learning path decision tree
+def recommend_resources(score, struggle_area):
+    if score < 50:
+        return f"Provide basic resources in {struggle_area}."
+    elif score < 70:
+        return f"Provide intermediate resources in {struggle_area}."
+    else:
+        return "Provide advanced resources."
+
+
+# Batch version of the decision tree: tiers are computed for the whole column at once
+# and every distinct recommendation string is built (and interned) exactly once
+class RecommendationEngine:
+    def __init__(self, rules=None, fallback=ADVANCED_RECOMMENDATION):
+        rules = DEFAULT_RULES if rules is None else sorted(rules, key=lambda rule: rule[0])
+        self.thresholds = np.array([threshold for threshold, _ in rules], dtype=float)
+        self.templates = [template for _, template in rules]
+        self.fallback = sys.intern(fallback)
+
+    # Tier index per score: 0 for the lowest threshold, len(rules) for the fallback.
+    # NaN scores fail every `<` comparison in the scalar API, so they land on the fallback too.
+    def tiers(self, scores):
+        scores = np.asarray(scores, dtype=float)
+        tiers = np.searchsorted(self.thresholds, scores, side='right')
+        tiers[np.isnan(scores)] = len(self.thresholds)
+        return tiers
+
+    def recommend(self, scores, struggle_areas):
+        tiers = self.tiers(scores)
+        values = np.asarray(struggle_areas, dtype=object)
+        area_codes, areas = pd.factorize(values)
+        areas = list(areas)
+
+        # factorize folds None and NaN together, but the scalar API formats them differently
+        missing = area_codes == -1
+        if missing.any():
+            missing_codes, missing_areas = pd.factorize(np.array([str(v) for v in values[missing]], dtype=object))
+            area_codes[missing] = len(areas) + missing_codes
+            areas.extend(missing_areas)
+
+        # One label per (tier, area) pair plus the shared fallback label
+        labels = [sys.intern(template.format(area)) for template in self.templates for area in areas]
+        labels.append(self.fallback)
+
+        n_areas = len(areas)
+        codes = np.where(tiers < len(self.templates), tiers * n_areas + area_codes, len(labels) - 1)
+
+        # Different areas may still format to the same text, so collapse duplicate labels
+        label_codes, categories = pd.factorize(np.array(labels, dtype=object))
+        return pd.Categorical.from_codes(label_codes[codes], categories=categories)
+
+
+DEFAULT_ENGINE = RecommendationEngine()
+
+
+# Recommendation column for a whole roster, as a categorical aligned to `scores`
+def recommend_batch(scores, struggle_areas, engine=None):
+    engine = DEFAULT_ENGINE if engine is None else engine
+    recommendations = engine.recommend(scores, struggle_areas)
+    if isinstance(scores, pd.Series):
+        return pd.Series(recommendations, index=scores.index, name='Recommendation')
+    return recommendations
+
+
+# Student/recommendation pairs as one markdown block, instead of one element per student
+def recommendations_markdown(students, recommendations):
+    return "\n\n".join(
+        f"**Student:** {student}  \n**Recommendation:** {recommendation}"
+        for student, recommendation in zip(students, recommendations)
+    )
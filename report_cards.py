@@ -0,0 +1,233 @@
+import contextlib
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from io import BytesIO
+from multiprocessing import get_context
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet
+
+
+ACTIVITY_COLUMNS = ["Subject", "Activity", "Score", "Date"]
+ACTIVITY_COL_WIDTHS = [1.5*inch, 1.5*inch, 1*inch, 1.5*inch]
+STATS_COL_WIDTHS = [3*inch, 2*inch]
+STANDING_COLUMNS = ["Subject", "Average", "Class Rank", "Percentile"]
+STANDING_COL_WIDTHS = [1.5*inch, 1.25*inch, 1.25*inch, 1.25*inch]
+
+# Rows per activity table chunk; a full chunk plus its header fits on one letter page,
+# so long histories are laid out page by page instead of splitting one huge table
+ACTIVITY_ROWS_PER_CHUNK = 30
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+# Paragraph styles are built once per process and shared by every report
+@lru_cache(maxsize=1)
+def get_styles():
+    return getSampleStyleSheet()
+
+
+def teacher_comment(mean_score):
+    if mean_score >= 80:
+        return "Excellent work! Keep up the great performance."
+    elif mean_score >= 60:
+        return "Good job! There is room for improvement."
+    else:
+        return "Needs improvement. Consider revising the material more thoroughly."
+
+
+# Statistics for the report card, computed straight from the score column
+def report_stats(student_data):
+    scores = student_data['score'].to_numpy()
+    return {
+        'mean_score': scores.mean() if len(scores) else float('nan'),
+        'max_score': scores.max() if len(scores) else None,
+        'min_score': scores.min() if len(scores) else None,
+        'total_activities': int(student_data['activity'].count()),
+    }
+
+
+# Activity table rows built from whole columns at once rather than row by row
+def activity_rows(student_data):
+    return list(zip(
+        student_data['subject'].astype(str).to_numpy(),
+        student_data['activity'].astype(str).str.capitalize().to_numpy(),
+        student_data['score'].astype(str).to_numpy(),
+        student_data['timestamp'].dt.strftime('%Y-%m-%d').to_numpy(),
+    ))
+
+
+# Activity history as a run of page-sized tables, each repeating the header row
+def activity_tables(student_data):
+    rows = activity_rows(student_data)
+    tables = []
+    for start in range(0, max(len(rows), 1), ACTIVITY_ROWS_PER_CHUNK):
+        table = Table([ACTIVITY_COLUMNS] + rows[start:start + ACTIVITY_ROWS_PER_CHUNK], colWidths=ACTIVITY_COL_WIDTHS, repeatRows=1)
+        table.setStyle(TABLE_STYLE)
+        tables.append(table)
+    return tables
+
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 9)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+# Shared report card renderer used by every page.
+# `output` may be a file path or a writable binary file; when omitted a BytesIO is returned.
+# `stats` overrides the statistics computed from `student_data`, `subject` and `status` add the
+# per-subject header line and pass/fail row, and `class_highest` adds the class-wide highest mark.
+# `standings` (Leaderboard.standings) adds the student's rank and percentile in each subject.
+def render_report_card(student_data, student_name, output=None, title=None, subject=None, stats=None, status=None, class_highest=None, standings=None):
+    buffer = BytesIO() if output is None else output
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+    styles = get_styles()
+    normal_style = styles['Normal']
+    spacer = Paragraph("<br/>", normal_style)
+
+    stats = report_stats(student_data) if stats is None else stats
+    mean_score = stats['mean_score']
+
+    # Title
+    elements = [Paragraph(title or f"Comprehensive Report Card for {student_name}", styles['Title']), spacer]
+    if subject is not None:
+        elements += [Paragraph(f"Subject: {subject}", normal_style), spacer]
+
+    # Overall Statistics Table
+    stats_data = [
+        ["Metric", "Value"],
+        ["Average Score", f"{mean_score:.2f}"],
+        ["Maximum Score", str(stats['max_score'])],
+        ["Minimum Score", str(stats['min_score'])],
+        ["Total Activities", str(stats['total_activities'])]
+    ]
+    if status is not None:
+        stats_data.append(["Status", status])
+    stats_table = Table(stats_data, colWidths=STATS_COL_WIDTHS)
+    stats_table.setStyle(TABLE_STYLE)
+    elements += [stats_table, spacer]
+
+    # Class Standing Table
+    if standings is not None and not standings.empty:
+        standing_rows = [
+            [str(group), f"{average:.2f}", f"{rank} of {students}", f"{percentile:.0f}%"]
+            for group, average, rank, students, percentile in zip(
+                standings.iloc[:, 0], standings['average_score'], standings['rank'], standings['students'], standings['percentile']
+            )
+        ]
+        standing_table = Table([STANDING_COLUMNS] + standing_rows, colWidths=STANDING_COL_WIDTHS)
+        standing_table.setStyle(TABLE_STYLE)
+        elements += [standing_table, spacer]
+
+    # Individual Activity Marks Table
+    elements += activity_tables(student_data)
+    elements.append(spacer)
+
+    # Highest marks and comments
+    elements += [Paragraph(f"Highest Marks Achieved by {student_name}: {stats['max_score']}", normal_style), spacer]
+    if class_highest is not None:
+        elements += [Paragraph(f"Highest Marks Achieved by Any Student in the Class: {class_highest}", normal_style), spacer]
+    elements += [Paragraph(f"Comments: {teacher_comment(mean_score)}", normal_style), spacer]
+
+    doc.build(elements, onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+# Function to generate PDF report card
+def generate_pdf(student_data, selected_student, class_highest=None, standings=None):
+    return render_report_card(student_data, selected_student, class_highest=class_highest, standings=standings)
+
+
+# File name for one student's card inside the class archive
+def report_file_name(student_id, student_name):
+    safe_name = re.sub(r'[^A-Za-z0-9_-]+', '_', str(student_name)).strip('_') or 'student'
+    return f"{safe_name}_{student_id}_Report_Card.pdf"
+
+
+# Worker: render one card and spool it to disk so the parent never holds the PDF bytes
+def render_report_file(student_id, student_name, student_data, spool_dir, class_highest=None, standings=None):
+    path = os.path.join(spool_dir, report_file_name(student_id, student_name))
+    render_report_card(student_data, student_name, output=path, class_highest=class_highest, standings=standings)
+    return student_id, path
+
+
+# Render report cards for every student in the index on a process pool and stream them into one ZIP
+# (there is no merged-PDF output: that would need a PDF merging library the project does not use).
+# The archive is built in a temporary file next to `zip_path` and moved into place when complete,
+# so concurrent runs for the same path never write into each other's archive.
+# At most `max_in_flight` students are pickled or waiting on disk at any moment, and each finished
+# file is copied into the archive and deleted straight away, so peak memory stays bounded by the
+# window rather than the size of the class. `progress(done, total)` is called after every card.
+# With a `leaderboard`, each card also gets the class highest mark and the student's subject standings,
+# read from the leaderboard's cached orderings rather than recomputed per student.
+# For an index and leaderboard that other threads update, pass their `lock`: it is held only while
+# the class list and each student's rows are read, never while a card renders.
+def generate_class_reports(student_index, zip_path, max_workers=None, max_in_flight=None, progress=None, leaderboard=None, lock=None):
+    lock = lock or contextlib.nullcontext()
+    with lock:
+        student_ids = student_index.student_ids()
+        class_highest = leaderboard.highest_score() if leaderboard is not None else None
+    total = len(student_ids)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or max_workers * 2
+
+    done = 0
+    pending = set()
+    remaining = iter(student_ids)
+
+    partial_zip = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(zip_path)), prefix='.class_reports_', suffix='.zip', delete=False)
+    try:
+        # Spawned workers avoid forking the threaded Streamlit server
+        with tempfile.TemporaryDirectory(prefix='report_cards_') as spool_dir, \
+                zipfile.ZipFile(partial_zip, 'w', compression=zipfile.ZIP_DEFLATED) as archive, \
+                ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context('spawn')) as pool:
+
+            def submit_next():
+                student_id = next(remaining, None)
+                if student_id is None:
+                    return False
+                with lock:
+                    student_name = student_index.names[student_id]
+                    student_data = student_index.student_rows(student_id)
+                    standings = leaderboard.standings(student_id) if leaderboard is not None else None
+                pending.add(pool.submit(render_report_file, student_id, student_name, student_data, spool_dir, class_highest, standings))
+                return True
+
+            while len(pending) < max_in_flight and submit_next():
+                pass
+
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    _, path = future.result()
+                    archive.write(path, arcname=os.path.basename(path))
+                    os.remove(path)
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+                    submit_next()
+        partial_zip.close()
+        os.replace(partial_zip.name, zip_path)
+    except BaseException:
+        partial_zip.close()
+        os.remove(partial_zip.name)
+        raise
+
+    return zip_path
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from recommendations import recommend_batch
+from student_dataset import GRADE_COLUMNS, GRADE_SUBJECTS, RATING_COLUMNS, normalized_grades
+
+FEATURE_COLUMNS = GRADE_COLUMNS + RATING_COLUMNS
+
+# Largest block of the distance matrix held at once, in elements (float32: 4 bytes each)
+MAX_BLOCK_ELEMENTS = 32 * 1024 * 1024
+
+
+# Nearest-neighbour index over standardized grade and rating vectors.
+# Squared Euclidean distances are computed block by block as |a|^2 + |b|^2 - 2ab, so all-pairs
+# queries never hold more than MAX_BLOCK_ELEMENTS distances in memory.
+class SimilarityIndex:
+    def __init__(self, dataset, columns=FEATURE_COLUMNS):
+        raw = dataset[columns].to_numpy(dtype=np.float64)
+        self.columns = list(columns)
+        self.means = np.nanmean(raw, axis=0)
+        stds = np.nanstd(raw, axis=0)
+        self.stds = np.where(stds > 0, stds, 1.0)
+        self.features = self.normalize(raw)
+        self.sq_norms = np.einsum('ij,ij->i', self.features, self.features)
+
+    def __len__(self):
+        return len(self.features)
+
+    # Standardize raw feature rows; missing values sit at the column mean
+    def normalize(self, raw):
+        raw = np.where(np.isnan(raw), self.means, raw)
+        return ((raw - self.means) / self.stds).astype(np.float32)
+
+    def _block_rows(self, max_block_elements):
+        return max(1, max_block_elements // max(len(self), 1))
+
+    def _block_distances(self, block):
+        sq_norms = np.einsum('ij,ij->i', block, block)
+        distances = sq_norms[:, None] + self.sq_norms[None, :] - 2.0 * (block @ self.features.T)
+        return np.maximum(distances, 0.0)
+
+    # k smallest entries per row of `distances`, sorted by distance then position
+    @staticmethod
+    def _top_k(distances, k):
+        k = min(k, distances.shape[1])
+        if k == 0:
+            return np.empty((len(distances), 0), dtype=int), np.empty((len(distances), 0), dtype=distances.dtype)
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+        order = np.lexsort((candidates, candidate_distances), axis=1)
+        indices = np.take_along_axis(candidates, order, axis=1)
+        return indices, np.sqrt(np.take_along_axis(candidate_distances, order, axis=1))
+
+    # k nearest students to each raw feature row in `vectors`
+    def query(self, vectors, k=5, max_block_elements=MAX_BLOCK_ELEMENTS):
+        queries = self.normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float64)))
+        block_rows = self._block_rows(max_block_elements)
+        results = [self._top_k(self._block_distances(queries[start:start + block_rows]), k) for start in range(0, len(queries), block_rows)]
+        if not results:
+            return np.empty((0, k), dtype=int), np.empty((0, k), dtype=np.float32)
+        return np.vstack([indices for indices, _ in results]), np.vstack([distances for _, distances in results])
+
+    # k nearest other students for the students at `positions` (excluding themselves)
+    def neighbours(self, positions, k=5, max_block_elements=MAX_BLOCK_ELEMENTS):
+        positions = np.atleast_1d(np.asarray(positions))
+        block_rows = self._block_rows(max_block_elements)
+        all_indices, all_distances = [], []
+        for start in range(0, len(positions), block_rows):
+            block_positions = positions[start:start + block_rows]
+            distances = self._block_distances(self.features[block_positions])
+            distances[np.arange(len(block_positions)), block_positions] = np.inf
+            indices, block_distances = self._top_k(distances, k)
+            all_indices.append(indices)
+            all_distances.append(block_distances)
+        if not all_indices:
+            return np.empty((0, k), dtype=int), np.empty((0, k), dtype=np.float32)
+        return np.vstack(all_indices), np.vstack(all_distances)
+
+    # Top-k neighbours of every student, computed in row blocks
+    def all_pairs(self, k=5, max_block_elements=MAX_BLOCK_ELEMENTS):
+        return self.neighbours(np.arange(len(self)), k, max_block_elements)
+
+
+# Peer-driven struggle areas: the subject where each student trails the mean of their k nearest
+# peers by the most, and the student's own normalized grade in that subject as the score
+def peer_struggle_areas(dataset, index, k=5):
+    grades = normalized_grades(dataset)
+    own = grades.to_numpy(dtype=np.float64)
+    neighbour_indices, _ = index.all_pairs(k)
+    peer_means = np.nanmean(own[neighbour_indices], axis=1)
+    gaps = np.nan_to_num(peer_means - own, nan=-np.inf)
+    weakest = np.argmax(gaps, axis=1)
+    return pd.DataFrame({
+        'Student': dataset['name'].astype(str).to_numpy(),
+        'Score': np.round(own[np.arange(len(own)), weakest], 1),
+        'Struggles_with': np.array([GRADE_SUBJECTS[column] for column in GRADE_COLUMNS], dtype=object)[weakest],
+    }, index=dataset.index)
+
+
+# Recommendations for the whole roster based on each student's nearest peers
+def peer_recommendations(dataset, index, k=5):
+    peers = peer_struggle_areas(dataset, index, k)
+    peers['Recommendation'] = recommend_batch(peers['Score'], peers['Struggles_with'])
+    return peers
@@ -0,0 +1,200 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+DB_PATH = os.environ.get('CLASSROOM_DB', 'classroom.db')
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS student_performance (
+    id INTEGER PRIMARY KEY,
+    student TEXT NOT NULL,
+    score REAL NOT NULL,
+    struggles_with TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_student_performance_student ON student_performance (student);
+
+CREATE TABLE IF NOT EXISTS activity_scores (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    student_name TEXT,
+    activity TEXT,
+    subject TEXT,
+    score REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_activity_scores_student_subject ON activity_scores (student_id, subject);
+CREATE INDEX IF NOT EXISTS idx_activity_scores_subject ON activity_scores (subject);
+
+CREATE TABLE IF NOT EXISTS poll_responses (
+    id INTEGER PRIMARY KEY,
+    question_key TEXT NOT NULL,
+    question TEXT,
+    answer TEXT,
+    correct INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_poll_responses_question ON poll_responses (question_key);
+"""
+
+INSERT_STUDENT = "INSERT INTO student_performance (student, score, struggles_with, created_at) VALUES (?, ?, ?, ?)"
+INSERT_ACTIVITY = (
+    "INSERT INTO activity_scores (student_id, student_name, activity, subject, score, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_POLL_RESPONSE = "INSERT INTO poll_responses (question_key, question, answer, correct, created_at) VALUES (?, ?, ?, ?, ?)"
+
+# Table written by each insert statement
+TABLES = {
+    INSERT_STUDENT: 'student_performance',
+    INSERT_ACTIVITY: 'activity_scores',
+    INSERT_POLL_RESPONSE: 'poll_responses',
+}
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# SQLite store with a write-behind queue.
+# Callers only enqueue rows; a background thread drains the queue and writes each batch in a
+# single transaction, so the UI thread never waits on disk. WAL mode lets reads run alongside it.
+# Every write gets an increasing sequence number, returned by the add_* methods, and
+# `versions[table]` is the sequence number of the last row written to that table. A table's
+# version is a cache key for reads of that table alone, and a row is committed once its
+# table's version has reached the row's sequence number.
+class ClassroomStore:
+    def __init__(self, path=DB_PATH, batch_size=500, flush_interval=0.25):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.versions = dict.fromkeys(TABLES.values(), 0)
+        self._sequence = 0
+        self._enqueue_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._local = threading.local()
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name='classroom-store-writer', daemon=True)
+        self._writer.start()
+
+    # Writes; each returns the row's sequence number
+
+    def _enqueue(self, sql, params):
+        # Sequence numbers are handed out in queue order, so the writer sees them ascending
+        with self._enqueue_lock:
+            self._sequence += 1
+            self._queue.put((sql, (self._sequence, params)))
+            return self._sequence
+
+    def add_student(self, student, score, struggles_with):
+        return self._enqueue(INSERT_STUDENT, (student, float(score), struggles_with, time.time()))
+
+    def add_activity(self, student_id, student_name, activity, subject, score, timestamp):
+        return self._enqueue(INSERT_ACTIVITY, (student_id, student_name, activity, subject, float(score), pd.Timestamp(timestamp).isoformat()))
+
+    def add_poll_response(self, question_key, question, answer, correct):
+        return self._enqueue(INSERT_POLL_RESPONSE, (question_key, question, str(answer), int(bool(correct)), time.time()))
+
+    # Block until everything queued so far is committed; for shutdown, scripts and tests
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            waiters = [params for sql, params in batch if sql is None]
+            grouped, last_sequence = {}, {}
+            for sql, params in batch:
+                if sql is not None:
+                    sequence, row = params
+                    grouped.setdefault(sql, []).append(row)
+                    last_sequence[sql] = sequence
+            if grouped:
+                try:
+                    with conn:
+                        for sql, rows in grouped.items():
+                            conn.executemany(sql, rows)
+                except sqlite3.Error:
+                    logger.exception("Failed to write %d queued rows to %s", len(batch) - len(waiters), self.path)
+                # Rows that failed are dropped rather than retried, so their tables' versions move on too
+                for sql, sequence in last_sequence.items():
+                    self.versions[TABLES[sql]] = sequence
+            for done in waiters:
+                done.set()
+
+    # Reads, on one connection per reading thread
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def _query(self, sql, params=(), parse_dates=None):
+        return pd.read_sql_query(sql, self._reader(), params=params, parse_dates=parse_dates)
+
+    def load_students(self):
+        return self._query(
+            "SELECT student AS Student, score AS Score, struggles_with AS Struggles_with FROM student_performance ORDER BY id"
+        )
+
+    # Activity rows, optionally narrowed to one student and/or subject through the indexes, or to
+    # the rows committed after row `after_id` for reading the table incrementally
+    def load_activities(self, student_id=None, subject=None, after_id=None):
+        clauses, params = [], []
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        if student_id is not None:
+            clauses.append("student_id = ?")
+            params.append(student_id)
+        if subject is not None:
+            clauses.append("subject = ?")
+            params.append(subject)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(
+            "SELECT id, student_id, student_name, activity, subject, score, timestamp FROM activity_scores"
+            f"{where} ORDER BY id",
+            params,
+            parse_dates=['timestamp'],
+        )
+
+    def load_poll_responses(self, question_key=None):
+        where, params = ("WHERE question_key = ?", (question_key,)) if question_key is not None else ("", ())
+        return self._query(f"SELECT question_key, question, answer, correct, created_at FROM poll_responses {where} ORDER BY id", params)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# One store (and one writer thread) per database file for the whole process, shared by every page
+def get_store(path=DB_PATH):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ClassroomStore(path)
+        return _stores[path]
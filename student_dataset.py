@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # the Arrow cache is optional; without it the CSV is parsed on every load
+    pa = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(ROOT, 'student-dataset.csv')
+CACHE_DIR = os.path.join(ROOT, '.cache')
+
+CATEGORY_COLUMNS = ['nationality', 'city', 'gender', 'ethnic.group']
+GRADE_COLUMNS = ['english.grade', 'math.grade', 'sciences.grade', 'language.grade']
+RATING_COLUMNS = ['portfolio.rating', 'coverletter.rating', 'refletter.rating']
+
+# Full marks per grade column; language is graded out of 5, the rest out of 4
+GRADE_SCALES = {'english.grade': 4.0, 'math.grade': 4.0, 'sciences.grade': 4.0, 'language.grade': 5.0}
+GRADE_SUBJECTS = {'english.grade': 'English', 'math.grade': 'Math', 'sciences.grade': 'Science', 'language.grade': 'Language'}
+
+DTYPES = {
+    'id': 'int32',
+    'name': 'string',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'age': 'Int16',
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+    **{column: 'float32' for column in GRADE_COLUMNS + RATING_COLUMNS},
+}
+
+
+# Parse the CSV with explicit dtypes; only the literal "NA" and empty fields count as missing
+def read_dataset_csv(path=DATASET_PATH):
+    return pd.read_csv(path, dtype=DTYPES, na_values=['NA', ''], keep_default_na=False)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(path, cache_dir):
+    base = os.path.join(cache_dir, os.path.basename(path))
+    return base + '.arrow', base + '.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _write_arrow(df, arrow_path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = arrow_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+
+# The cached Arrow table, read in one go; to_pandas copies every column out of it anyway
+# (categoricals, and floats whose nulls become NaN), so a memory map would not save memory
+def _read_arrow(arrow_path):
+    with pa.OSFile(arrow_path, 'rb') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+# Load student-dataset.csv through an uncompressed Arrow IPC copy kept in `cache_dir`.
+# The copy only saves the CSV parse and dtype conversion; the frame is still built in memory.
+# The copy is reused while the CSV's mtime and size are unchanged; if they change, the CSV is
+# hashed and only reparsed when its contents actually differ.
+def load_student_dataset(path=DATASET_PATH, cache_dir=CACHE_DIR):
+    if pa is None:
+        return read_dataset_csv(path)
+
+    arrow_path, meta_path = _cache_paths(path, cache_dir)
+    stat = os.stat(path)
+    meta = _read_meta(meta_path)
+    if os.path.exists(arrow_path) and meta is not None:
+        if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+            return _read_arrow(arrow_path).to_pandas()
+        digest = file_digest(path)
+        if meta.get('sha256') == digest:
+            _write_meta(meta_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest})
+            return _read_arrow(arrow_path).to_pandas()
+    else:
+        digest = file_digest(path)
+
+    df = read_dataset_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_arrow(df, arrow_path)
+    _write_meta(meta_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest})
+    return df
+
+
+# Grades rescaled to 0-100, one column per subject
+def normalized_grades(dataset):
+    return pd.DataFrame(
+        {GRADE_SUBJECTS[column]: dataset[column].to_numpy(dtype=np.float32) / GRADE_SCALES[column] * 100 for column in GRADE_COLUMNS},
+        index=dataset.index,
+    )
+
+
+# Roster in the shape app.py uses: overall score and the weakest subject per student
+def roster_frame(dataset):
+    grades = normalized_grades(dataset)
+    values = grades.to_numpy()
+    weakest = np.array(grades.columns)[np.argmin(np.where(np.isnan(values), np.inf, values), axis=1)]
+    return pd.DataFrame({
+        'Student': dataset['name'].astype(str).to_numpy(),
+        'Score': np.round(np.nanmean(values, axis=1).astype(float), 1),
+        'Struggles_with': weakest,
+    })
+
+
+# Grades as activity rows in the Progress Tracker schema, one "grade" activity per subject,
+# dated `as_of` since the dataset carries no per-grade timestamps
+def grade_activities(dataset, as_of):
+    grades = normalized_grades(dataset)
+    n_students, n_subjects = grades.shape
+    return pd.DataFrame({
+        'student_id': np.repeat([f"student_{student_id}" for student_id in dataset['id'].to_numpy()], n_subjects),
+        'student_name': np.repeat(dataset['name'].astype(str).to_numpy(), n_subjects),
+        'activity': 'grade',
+        'subject': np.tile(np.array(grades.columns, dtype=object), n_students),
+        'score': np.round(grades.to_numpy(dtype=float).ravel(), 1),
+        'timestamp': pd.Timestamp(as_of),
+    })
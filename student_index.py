@@ -0,0 +1,71 @@
+import numpy as np
+
+
+# Overall statistics and activity summaries for every student in `df`
+def _aggregate(df):
+    grouped = df.groupby('student_id', sort=False)
+    overall = grouped.agg(
+        mean_score=('score', 'mean'),
+        max_score=('score', 'max'),
+        min_score=('score', 'min'),
+        total_activities=('activity', 'count'),
+    )
+    summary = df.groupby(['student_id', 'activity'], sort=True).agg(
+        average_score=('score', 'mean'),
+        total_count=('score', 'count'),
+    ).reset_index()
+    return overall.to_dict('index'), summary[['activity', 'average_score', 'total_count']], summary.groupby('student_id', sort=False).indices
+
+
+# Per-student lookup tables for the Progress Tracker, built once per version of the activity frame.
+# Every lookup is a dict access plus a gather of that student's own rows, never a scan of the class.
+class StudentIndex:
+    def __init__(self, df):
+        self.df = df
+
+        grouped = df.groupby('student_id', sort=False)
+        self.positions = {student_id: np.asarray(rows) for student_id, rows in grouped.indices.items()}
+        self.names = grouped['student_name'].first().to_dict()
+
+        # Overall statistics per student, and activity summaries for every student in one frame
+        # with each student's block addressed by row positions
+        self.overall, self._summary, self._summary_rows = _aggregate(df)
+        self._extended_summaries = {}
+
+    # Fold rows appended to the frame (at positions `start` onwards) into the index.
+    # Only the students who received new rows have their aggregates recomputed.
+    def extend(self, df, start):
+        self.df = df
+        new_rows = df.iloc[start:]
+        if new_rows.empty:
+            return
+        grouped = new_rows.groupby('student_id', sort=False)
+        for student_id, rows in grouped.indices.items():
+            rows = np.asarray(rows) + start
+            self.positions[student_id] = np.concatenate([self.positions[student_id], rows]) if student_id in self.positions else rows
+        for student_id, name in grouped['student_name'].first().items():
+            self.names.setdefault(student_id, name)
+
+        affected = list(grouped.indices)
+        overall, summary, summary_rows = _aggregate(df.iloc[np.concatenate([self.positions[student_id] for student_id in affected])])
+        self.overall.update(overall)
+        for student_id, rows in summary_rows.items():
+            self._extended_summaries[student_id] = summary.iloc[rows].reset_index(drop=True)
+
+    def __contains__(self, student_id):
+        return student_id in self.positions
+
+    def student_ids(self):
+        return list(self.positions)
+
+    def student_rows(self, student_id):
+        return self.df.iloc[self.positions.get(student_id, [])]
+
+    def activity_summary(self, student_id):
+        if student_id in self._extended_summaries:
+            return self._extended_summaries[student_id]
+        rows = self._summary_rows.get(student_id, [])
+        return self._summary.iloc[rows].reset_index(drop=True)
+
+    def overall_stats(self, student_id):
+        return self.overall.get(student_id)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from student_dataset import GRADE_COLUMNS, RATING_COLUMNS
+
+SUBJECTS = ['Math', 'Science', 'History', 'English']
+ACTIVITIES = ['quiz', 'test', 'poll']
+FIRST_NAMES = ['Alice', 'Bob', 'Charlie', 'Dana', 'Elif', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jamal', 'Kiana', 'Luca']
+LAST_NAMES = ['Lor', 'Novak', 'Okafor', 'Park', 'Quinn', 'Rossi', 'Silva', 'Tanaka', 'Umar', 'Vance']
+NATIONALITIES = ['China', 'United States of America', 'India', 'Germany', 'Brazil', 'Nigeria', 'Japan', 'France']
+CITIES = ['Suzhou', 'Santa Clarita', 'Pune', 'Berlin', 'Recife', 'Lagos', 'Osaka', 'Lyon', 'Oakland', 'Austin']
+ETHNIC_GROUPS = ['NA', 'Asian', 'Black', 'Hispanic', 'White']
+
+
+def student_names(n_students, rng):
+    first = rng.choice(FIRST_NAMES, n_students)
+    last = rng.choice(LAST_NAMES, n_students)
+    return np.char.add(np.char.add(first, ' '), last).astype(object)
+
+
+# Activity rows in the pages/ap.py schema: every student gets at least one activity and the rest
+# are spread at random, with scores around a per-student ability and timestamps over `days`
+def synthetic_activities(n_activities, n_students, days=120, seed=0):
+    rng = np.random.default_rng(seed)
+    n_students = min(n_students, n_activities)
+    owners = np.concatenate([np.arange(n_students), rng.integers(0, n_students, n_activities - n_students)])
+    rng.shuffle(owners)
+    ability = rng.normal(75, 10, n_students)
+    names = student_names(n_students, rng)
+    ids = np.array([f"student_{i:06d}" for i in range(n_students)], dtype=object)
+    start = np.datetime64('2024-08-15T00:00:00', 's')
+    return pd.DataFrame({
+        'student_id': ids[owners],
+        'student_name': names[owners],
+        'activity': np.array(ACTIVITIES, dtype=object)[rng.integers(0, len(ACTIVITIES), n_activities)],
+        'subject': np.array(SUBJECTS, dtype=object)[rng.integers(0, len(SUBJECTS), n_activities)],
+        'score': np.clip(np.rint(ability[owners] + rng.normal(0, 8, n_activities)), 0, 100).astype(np.int64),
+        'timestamp': pd.to_datetime(start + rng.integers(0, days * 86400, n_activities).astype('timedelta64[s]')),
+    })
+
+
+# Roster rows in the app.py schema
+def synthetic_roster(n_students, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Student': student_names(n_students, rng),
+        'Score': rng.integers(40, 101, n_students),
+        'Struggles_with': np.array(SUBJECTS, dtype=object)[rng.integers(0, len(SUBJECTS), n_students)],
+    })
+
+
+# Rows in the student-dataset.csv schema, with a few missing grades as in the real file
+def synthetic_dataset(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    city = rng.integers(0, len(CITIES), n_rows)
+    city_lat = rng.uniform(-40, 60, len(CITIES))
+    city_lon = rng.uniform(-120, 140, len(CITIES))
+    frame = pd.DataFrame({
+        'id': np.arange(n_rows, dtype=np.int32),
+        'name': student_names(n_rows, rng),
+        'nationality': rng.choice(NATIONALITIES, n_rows),
+        'city': np.array(CITIES, dtype=object)[city],
+        'latitude': np.round(city_lat[city] + rng.normal(0, 0.5, n_rows), 2),
+        'longitude': np.round(city_lon[city] + rng.normal(0, 0.5, n_rows), 2),
+        'gender': rng.choice(['F', 'M'], n_rows),
+        'ethnic.group': rng.choice(ETHNIC_GROUPS, n_rows),
+        'age': rng.integers(18, 30, n_rows),
+    })
+    for column in GRADE_COLUMNS:
+        top = 5 if column == 'language.grade' else 4
+        grades = np.round(rng.uniform(1, top, n_rows), 1)
+        grades[rng.random(n_rows) < 0.01] = np.nan
+        frame[column] = grades
+    for column in RATING_COLUMNS:
+        frame[column] = rng.integers(1, 6, n_rows)
+    return frame
+
+
+def write_dataset_csv(frame, path):
+    frame.to_csv(path, index=False, na_rep='NA')
+
+
+# Question-bank CSV bytes in the format pages/new2.py imports, with some repeated questions
+def synthetic_questions_csv(n_questions, duplicate_fraction=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    numbers = np.arange(n_questions)
+    repeats = rng.random(n_questions) < duplicate_fraction
+    numbers[repeats] = rng.integers(0, n_questions, repeats.sum())
+    frame = pd.DataFrame({
+        'question': [f"Question {number}?" for number in numbers],
+        **{f'option{i}': [f"Answer {number}.{i}" for number in numbers] for i in range(1, 5)},
+        'correct_answer': [f"Answer {number}.{1 + number % 4}" for number in numbers],
+    })
+    return frame.to_csv(index=False).encode()
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from lazy_imports import lazy_import
+
+Image = lazy_import('PIL.Image')
+
+UPLOAD_DIR = os.environ.get('CLASSROOM_UPLOADS', 'classroom_uploads')
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Longest side of the previews shown on the page
+THUMBNAIL_SIZE = 800
+
+StoredFile = namedtuple('StoredFile', ['digest', 'name', 'mime', 'size', 'created_at'])
+
+
+# Content-addressed store for classroom uploads on disk.
+# Uploads are copied in fixed-size chunks while being hashed, so the same file shared twice is
+# kept once; previews are downscaled once per file and served from disk like the originals.
+class UploadStore:
+    def __init__(self, root=UPLOAD_DIR, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.files_dir = os.path.join(root, 'files')
+        self.thumbnails_dir = os.path.join(root, 'thumbnails')
+        os.makedirs(self.files_dir, exist_ok=True)
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+        self._thumbnail_lock = threading.Lock()
+
+    def path(self, digest):
+        return os.path.join(self.files_dir, digest)
+
+    def _meta_path(self, digest):
+        return os.path.join(self.files_dir, digest + '.json')
+
+    # Spool a readable binary stream to disk; returns the stored file, existing or new
+    def save(self, stream, name, mime):
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.root, delete=False) as spool:
+            try:
+                for chunk in iter(lambda: stream.read(self.chunk_size), b''):
+                    digest.update(chunk)
+                    spool.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                spool.close()
+                os.remove(spool.name)
+                raise
+        digest = digest.hexdigest()
+
+        if os.path.exists(self.path(digest)):
+            os.remove(spool.name)
+            # The metadata is written after the data, so it can be missing: a concurrent save of
+            # the same content has not written it yet, or an earlier save crashed in between
+            stored = self.get(digest)
+            if stored is not None:
+                return stored
+        else:
+            os.replace(spool.name, self.path(digest))
+        stored = StoredFile(digest, os.path.basename(name), mime, size, time.time())
+        self._write_meta(stored)
+        return stored
+
+    def _write_meta(self, stored):
+        with tempfile.NamedTemporaryFile('w', dir=self.files_dir, suffix='.tmp', delete=False) as f:
+            json.dump(stored._asdict(), f)
+        os.replace(f.name, self._meta_path(stored.digest))
+
+    def get(self, digest):
+        try:
+            with open(self._meta_path(digest)) as f:
+                return StoredFile(**json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    # Every stored file, newest first
+    def files(self):
+        stored = [self.get(name[:-len('.json')]) for name in os.listdir(self.files_dir) if name.endswith('.json')]
+        return sorted((entry for entry in stored if entry is not None), key=lambda entry: -entry.created_at)
+
+    # The stored file opened for reading, so callers can hand it on without copying it first
+    def open(self, digest):
+        return open(self.path(digest), 'rb')
+
+    # Path of a JPEG preview no larger than `max_size` on either side, made on first request,
+    # or None if the file cannot be decoded as an image. That outcome is remembered with an
+    # empty marker file, so a corrupt or truncated upload is only ever opened once.
+    # JPEGs are decoded at a reduced scale (Image.draft), so large scans are never held at full size.
+    def thumbnail(self, digest, max_size=THUMBNAIL_SIZE):
+        path = os.path.join(self.thumbnails_dir, f"{digest}_{max_size}.jpg")
+        failed_path = path + '.failed'
+        if os.path.exists(path):
+            return path
+        if os.path.exists(failed_path):
+            return None
+        with self._thumbnail_lock:
+            if os.path.exists(path):
+                return path
+            try:
+                with Image.open(self.path(digest)) as image:
+                    image.draft('RGB', (max_size, max_size))
+                    image.thumbnail((max_size, max_size))
+                    preview = image.convert('RGB')
+            except (OSError, Image.DecompressionBombError):  # UnidentifiedImageError is an OSError
+                open(failed_path, 'wb').close()
+                return None
+            preview.save(path + '.tmp', format='JPEG', quality=85)
+            os.replace(path + '.tmp', path)
+        return path